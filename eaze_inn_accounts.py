@@ -15,6 +15,18 @@ import hashlib
 import traceback
 import collections
 import subprocess
+import codecs
+import mmap
+import re
+import io
+import functools
+import logging
+import logging.handlers
+import cProfile
+import pstats
+import tracemalloc
+import csv
+import bisect
 if os.name == 'nt':
     pass
 
@@ -25,7 +37,7 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
 from reportlab.lib.utils import ImageReader
-from openpyxl import Workbook
+from openpyxl import Workbook, load_workbook
 from PIL import Image, ImageTk
 import webbrowser
 
@@ -53,6 +65,8 @@ else:
 try:
     import matplotlib.pyplot as plt
     from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    from matplotlib.backends.backend_agg import FigureCanvasAgg # Thread-safe renderer for off-UI-thread charts
+    from matplotlib.figure import Figure
     matplotlib_installed = True
 except ImportError:
     matplotlib_installed = False
@@ -103,6 +117,53 @@ THERMAL_PRINTER_BAUDRATE = 9600
 THERMAL_PRINTER_FILE = "receipt_output.bin"
 RECEIPT_WIDTH = 32
 
+# --- Data Loading ---
+JSON_STREAM_CHUNK_SIZE = 64 * 1024 # Bytes read per step by the streaming JSON loader
+JSON_MMAP_THRESHOLD = 8 * 1024 * 1024 # Files at least this large are memory-mapped while loading
+
+# --- Diagnostics ---
+PERF_LOG_DIR = "eaze_inn_logs"
+PERF_LOG_FILE = os.path.join(PERF_LOG_DIR, "perf.log")
+PERF_LOG_MAX_BYTES = 1024 * 1024
+PERF_LOG_BACKUP_COUNT = 5
+PERF_SLOW_OPERATION_MS = 50 # Individual calls slower than this are written to the perf log
+PERF_SAMPLE_LIMIT = 1000 # Most recent timings kept per operation for percentiles
+PERF_METRICS_ENABLED = os.environ.get('EAZE_PERF', '0') not in ('', '0') # Also toggled from the Diagnostics panel
+
+# --- EazeBot Charting ---
+CHART_TYPES = ("Monthly Sales", "Monthly Purchases", "Sales vs Purchases", "Top Items (Sales)")
+CHART_CACHE_SIZE = 32 # Rendered chart images kept in the LRU cache
+CHART_TOP_ITEMS = 10
+
+# --- EazeBot Assistant ---
+GEMINI_MODEL_NAME = "gemini-1.5-flash"
+ASSISTANT_MAX_CALLS_PER_MINUTE = 15 # Gemini free-tier request limit
+ASSISTANT_BATCH_WINDOW_S = 0.05 # How long the worker waits to gather more questions into one batch
+ASSISTANT_BATCH_SIZE = 8 # Distinct questions of one batch are sent together in a single combined prompt
+ASSISTANT_CACHE_SIZE = 128
+ASSISTANT_TOP_N = 5 # Items/customers listed in the ledger summary
+AGEING_BUCKETS = ((30, "0-30 days"), (60, "31-60 days"), (90, "61-90 days"), (None, "90+ days"))
+
+# --- Bulk Import ---
+IMPORT_FILE_TYPES = [("Spreadsheets & JSON", "*.csv *.xlsx *.json"), ("CSV", "*.csv"), ("Excel", "*.xlsx"), ("JSON", "*.json")]
+IMPORT_COLUMN_ALIASES = { # Canonical column -> accepted header names (lower case, spaces as underscores)
+    'type': ('type', 'invoice_type'),
+    'ref': ('ref', 'invoice_no', 'invoice_number', 'bill_no', 'bill_number', 'number'),
+    'date': ('date', 'invoice_date', 'bill_date'),
+    'party': ('party', 'customer_name', 'supplier_name', 'customer', 'supplier', 'name'),
+    'item': ('item', 'item_name', 'description'),
+    'quantity': ('quantity', 'qty'),
+    'price': ('price', 'rate'),
+    'payment_status': ('payment_status', 'status'),
+}
+IMPORT_TYPE_ALIASES = {'customer': 'customer', 'sale': 'customer', 'sales': 'customer', 'invoice': 'customer',
+                       'supplier': 'supplier', 'purchase': 'supplier', 'purchases': 'supplier', 'bill': 'supplier'}
+IMPORT_STATUS_ALIASES = {'': 'P', 'p': 'P', 'pending': 'P', 'unpaid': 'P', 'c': 'C', 'paid': 'C', 'cleared': 'C'}
+IMPORT_MAX_REJECT_DETAILS = 1000 # Rejected rows kept in memory for the report; all of them go to the rejects file
+
+# --- Party Statements ---
+STATEMENTS_DIR = "eaze_inn_statements" # Default output folder for bulk statement runs
+
 # --- Global In-Memory Data Storage ---
 USERS_DATA = []
 INVOICES_DATA = []
@@ -112,6 +173,13 @@ SUPPLIER_INVOICE_ITEMS_DATA = []
 INVENTORY_DATA = [] # Holds inventory items: {id, item_name, quantity, value (cost_price)}
 PAYMENTS_DATA = []
 COMPANY_SETTINGS = {}
+DATA_VERSION = 0 # Bumped on every load/save so caches can key on the state of the data
+_SAVE_LOCK = threading.RLock() # Serialises file writes and DATA_VERSION bumps between the Tk thread and save workers
+# Lookup indexes, built as each data file finishes loading and kept in step on save
+INVOICE_ITEMS_BY_INVOICE = {} # invoice_id -> [invoice item records]
+SUPPLIER_INVOICE_ITEMS_BY_INVOICE = {} # supplier_invoice_id -> [supplier invoice item records]
+INVENTORY_BY_NAME = {} # normalised item_name -> inventory record
+PARTY_ROLLUPS = {} # (invoice_type, party name) -> statement rollup, see _new_party_rollup()
 GEMINI_API_KEY = None # Will be set at runtime
 
 DEFAULT_SETTINGS = {
@@ -124,11 +192,130 @@ DEFAULT_SETTINGS = {
 }
 
 
+# --- Performance Instrumentation ---
+_PERF_LOCK = threading.Lock()
+_PERF_STATS = {} # operation -> {'count', 'total_s', 'bytes', 'samples': deque of recent durations}
+_PERF_COUNTERS = collections.Counter()
+_PERF_LOGGER = None
+_PERF_PROFILER = None
+
+def _get_perf_logger():
+    global _PERF_LOGGER
+    if _PERF_LOGGER is None:
+        os.makedirs(PERF_LOG_DIR, exist_ok=True)
+        logger = logging.getLogger("eaze_inn.perf"); logger.setLevel(logging.INFO); logger.propagate = False
+        handler = logging.handlers.RotatingFileHandler(PERF_LOG_FILE, maxBytes=PERF_LOG_MAX_BYTES, backupCount=PERF_LOG_BACKUP_COUNT, encoding='utf-8')
+        handler.setFormatter(logging.Formatter("%(asctime)s %(threadName)s %(message)s")); logger.addHandler(handler)
+        _PERF_LOGGER = logger
+    return _PERF_LOGGER
+
+def _perf_entry(operation):
+    entry = _PERF_STATS.get(operation)
+    if entry is None: entry = _PERF_STATS[operation] = {'count': 0, 'total_s': 0.0, 'bytes': 0, 'samples': collections.deque(maxlen=PERF_SAMPLE_LIMIT)}
+    return entry
+
+def record_perf(operation, elapsed_s):
+    with _PERF_LOCK:
+        entry = _perf_entry(operation); entry['count'] += 1; entry['total_s'] += elapsed_s; entry['samples'].append(elapsed_s)
+    if elapsed_s * 1000 >= PERF_SLOW_OPERATION_MS:
+        try: _get_perf_logger().info(f"slow {operation} {elapsed_s * 1000:.1f}ms")
+        except OSError as e: print(f"Warning: could not write perf log: {e}")
+
+def record_perf_bytes(operation, byte_count):
+    if not PERF_METRICS_ENABLED: return
+    with _PERF_LOCK: _perf_entry(operation)['bytes'] += byte_count
+
+def perf_count(counter, amount=1):
+    if not PERF_METRICS_ENABLED: return
+    with _PERF_LOCK: _PERF_COUNTERS[counter] += amount
+
+def instrumented(operation):
+    """Decorator timing every call under `operation`. Costs a single flag check while metrics are disabled."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PERF_METRICS_ENABLED: return func(*args, **kwargs)
+            start = time.perf_counter()
+            try: return func(*args, **kwargs)
+            finally: record_perf(operation, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values: return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+def perf_snapshot():
+    """Return ([{operation, count, total_s, p50_ms, p95_ms, max_ms, bytes}], {counter: value}) for display or logging."""
+    with _PERF_LOCK:
+        stats = {operation: dict(entry, samples=sorted(entry['samples'])) for operation, entry in _PERF_STATS.items()}
+        counters = dict(_PERF_COUNTERS)
+    rows = []
+    for operation in sorted(stats):
+        entry = stats[operation]; samples = entry['samples']
+        rows.append({'operation': operation, 'count': entry['count'], 'total_s': entry['total_s'], 'bytes': entry['bytes'],
+                     'p50_ms': _percentile(samples, 0.50) * 1000, 'p95_ms': _percentile(samples, 0.95) * 1000, 'max_ms': (samples[-1] * 1000) if samples else 0.0})
+    return rows, counters
+
+def reset_perf_metrics():
+    with _PERF_LOCK: _PERF_STATS.clear(); _PERF_COUNTERS.clear()
+
+def write_perf_summary():
+    """Append the current latency/bytes table to the perf log. Returns False if nothing could be written."""
+    rows, counters = perf_snapshot()
+    if not rows and not counters: return False
+    try:
+        logger = _get_perf_logger()
+        for row in rows: logger.info(f"summary {row['operation']} calls={row['count']} p50={row['p50_ms']:.2f}ms p95={row['p95_ms']:.2f}ms max={row['max_ms']:.2f}ms bytes={row['bytes']}")
+        for counter, value in sorted(counters.items()): logger.info(f"counter {counter}={value}")
+        return True
+    except OSError as e: print(f"Warning: could not write perf log: {e}"); return False
+
+def is_profiling(): return _PERF_PROFILER is not None
+
+def start_profiling():
+    """Start cProfile (calling thread only) and tracemalloc allocation tracking."""
+    global _PERF_PROFILER
+    if _PERF_PROFILER is not None: return
+    tracemalloc.start(); _PERF_PROFILER = cProfile.Profile(); _PERF_PROFILER.enable()
+    print("Profiling started.")
+
+def stop_profiling():
+    """Stop profiling, save the raw cProfile stats next to the perf log and log the top functions and allocations. Returns the .prof path."""
+    global _PERF_PROFILER
+    if _PERF_PROFILER is None: return None
+    profiler, _PERF_PROFILER = _PERF_PROFILER, None; profiler.disable()
+    memory_snapshot = tracemalloc.take_snapshot(); tracemalloc.stop()
+    os.makedirs(PERF_LOG_DIR, exist_ok=True)
+    profile_path = os.path.join(PERF_LOG_DIR, f"profile_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.prof"); profiler.dump_stats(profile_path)
+    stats_text = io.StringIO(); pstats.Stats(profiler, stream=stats_text).sort_stats('cumulative').print_stats(25)
+    logger = _get_perf_logger(); logger.info(f"profile saved to {profile_path}\n{stats_text.getvalue()}")
+    for stat in memory_snapshot.statistics('lineno')[:15]: logger.info(f"alloc {stat}")
+    print(f"Profiling stopped. Stats saved to '{profile_path}'."); return profile_path
+
+def _dir_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try: total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError: pass
+    return total
+
+
 class DecimalEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, Decimal): return str(obj)
         return super(DecimalEncoder, self).default(obj)
 
+def set_data_dir(data_dir):
+    """Point DATA_DIR and every data file path at data_dir, e.g. for benchmarks run against a scratch copy."""
+    global DATA_DIR, USERS_FILE, INVOICES_FILE, INVOICE_ITEMS_FILE, SUPPLIER_INVOICES_FILE, SUPPLIER_INVOICE_ITEMS_FILE, INVENTORY_FILE, PAYMENTS_FILE, IMAGES_DIR, SETTINGS_FILE
+    DATA_DIR = data_dir
+    USERS_FILE = os.path.join(DATA_DIR, "users.json"); INVOICES_FILE = os.path.join(DATA_DIR, "invoices.json"); INVOICE_ITEMS_FILE = os.path.join(DATA_DIR, "invoice_items.json")
+    SUPPLIER_INVOICES_FILE = os.path.join(DATA_DIR, "supplier_invoices.json"); SUPPLIER_INVOICE_ITEMS_FILE = os.path.join(DATA_DIR, "supplier_invoice_items.json")
+    INVENTORY_FILE = os.path.join(DATA_DIR, "inventory.json"); PAYMENTS_FILE = os.path.join(DATA_DIR, "payments.json")
+    IMAGES_DIR = os.path.join(DATA_DIR, "invoice_images"); SETTINGS_FILE = os.path.join(DATA_DIR, "settings.json")
+
 def load_settings():
     global COMPANY_SETTINGS; COMPANY_SETTINGS = DEFAULT_SETTINGS.copy()
     try:
@@ -179,49 +366,185 @@ def _handle_invoice_image(original_path, invoice_type, invoice_id):
     return relative_path if relative_path else None
 
 
-def load_data(filepath):
-    data = []
+_JSON_WHITESPACE = re.compile(r'[ \t\r\n]*')
+_JSON_NUMBER_CHARS = re.compile(r'[0-9+\-.eE]*')
+_JSON_SPLIT_TAIL = 10 # A decode error this close to the end of the buffer may just be a token cut by the chunk ("-Infinit", "\\u12")
+
+def _iter_json_array(filepath, use_mmap=False, chunk_size=JSON_STREAM_CHUNK_SIZE, progress_callback=None):
+    """
+    Yield the elements of a top-level JSON array one at a time.
+    Only the undecoded tail of the file is buffered, so memory use stays flat however large the file is.
+    progress_callback, if given, is called as progress_callback(bytes_read, total_bytes) after every chunk.
+    Decode errors report line, column and character positions within the whole file.
+    """
+    total_bytes = os.path.getsize(filepath)
+    decoder = json.JSONDecoder(); text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    with open(filepath, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if use_mmap and total_bytes else None
+        buf = ''; pos = 0; bytes_read = 0; eof = False
+        dropped_chars = 0; dropped_lines = 0; line_start = 0 # Where buf starts in the file, for error positions
+        def read_more():
+            nonlocal buf, pos, bytes_read, eof, dropped_chars, dropped_lines, line_start
+            chunk = mapped[bytes_read:bytes_read + chunk_size] if mapped is not None else f.read(chunk_size)
+            bytes_read += len(chunk); eof = not chunk
+            last_newline = buf.rfind('\n', 0, pos)
+            if last_newline >= 0: dropped_lines += buf.count('\n', 0, pos); line_start = dropped_chars + last_newline + 1
+            dropped_chars += pos
+            # Drop consumed text so the buffer only ever holds the record being decoded
+            buf = buf[pos:] + text_decoder.decode(chunk, final=eof); pos = 0
+            if progress_callback and chunk: progress_callback(bytes_read, total_bytes)
+        def decode_error(msg, at):
+            file_pos = dropped_chars + at; last_newline = buf.rfind('\n', 0, at)
+            lineno = dropped_lines + buf.count('\n', 0, at) + 1
+            colno = at - last_newline if last_newline >= 0 else file_pos - line_start + 1
+            error = json.JSONDecodeError(msg, buf, at)
+            error.pos, error.lineno, error.colno = file_pos, lineno, colno
+            error.args = (f"{msg}: line {lineno} column {colno} (char {file_pos})",)
+            return error
+        try:
+            state = 'start' # start -> first (value or ']') -> sep (',' or ']') / value -> ... -> done
+            while True:
+                pos = _JSON_WHITESPACE.match(buf, pos).end()
+                if pos == len(buf):
+                    if not eof: read_more(); continue
+                    if state in ('start', 'done'): return # An empty file loads as an empty list
+                    raise decode_error("Unexpected end of data", pos)
+                char = buf[pos]
+                if state == 'start':
+                    if char != '[': raise decode_error("Expected a JSON array", pos)
+                    pos += 1; state = 'first'
+                elif state == 'done': raise decode_error("Extra data", pos)
+                elif state == 'sep' or (state == 'first' and char == ']'):
+                    if char == ']': pos += 1; state = 'done'
+                    elif char == ',': pos += 1; state = 'value'
+                    else: raise decode_error("Expecting ',' delimiter", pos)
+                else:
+                    try: record, end = decoder.raw_decode(buf, pos)
+                    except json.JSONDecodeError as e:
+                        # Only a record cut by the chunk boundary is worth more text; anything else is corrupt and fails now
+                        split = e.pos >= len(buf) - _JSON_SPLIT_TAIL or e.msg.startswith("Unterminated string")
+                        if eof or not split: raise decode_error(e.msg, e.pos)
+                        read_more(); continue
+                    # A number such as 1.5 or 1e5 split after "1." or "1e" decodes as 1; wait for a delimiter before trusting it
+                    if not eof and _JSON_NUMBER_CHARS.match(buf, end).end() == len(buf): read_more(); continue
+                    yield record; pos = end; state = 'sep'
+        finally:
+            if mapped is not None: mapped.close()
+
+def _convert_record(item, filepath):
+    """Convert the id and Decimal fields of a freshly parsed record in place. Returns None if the record must be skipped."""
+    try:
+        if 'id' in item and item['id'] is not None: item['id'] = int(item['id'])
+        if 'invoice_id' in item and item['invoice_id'] is not None: item['invoice_id'] = int(item['invoice_id'])
+        if 'supplier_invoice_id' in item and item['supplier_invoice_id'] is not None: item['supplier_invoice_id'] = int(item['supplier_invoice_id'])
+        # Ensure 'quantity' and 'value' (for inventory) are Decimal
+        # Other financial fields are already covered
+        for key in ['price', 'value', 'amount', 'total_amount', 'quantity', 'amount_paid']:
+            if key in item and item[key] is not None:
+                try: item[key] = Decimal(str(item[key]))
+                except InvalidOperation: print(f"Warn: Invalid Decimal for '{key}' in {filepath}, ID {item.get('id', 'N/A')}: '{item[key]}'. Setting to 0."); item[key] = ZERO_DECIMAL
+        return item
+    except (ValueError, TypeError) as conv_e: print(f"Warn: Skipping record due to conversion error in {filepath}: {item} - Error: {conv_e}"); return None
+
+@instrumented('load_data')
+def load_data(filepath, on_record=None, progress_callback=None, use_mmap=None):
+    """
+    Stream a JSON collection file into a list of records, converting ids and Decimal fields as each record arrives.
+    on_record(record) is called for every kept record once the whole file has loaded, so callers can build indexes;
+    a file that fails partway through leaves no index entries behind.
+    use_mmap defaults to memory-mapping files of JSON_MMAP_THRESHOLD bytes or more.
+    """
+    processed_data = []
     try:
         if not os.path.exists(filepath): print(f"Data file not found: {filepath}. Starting empty."); return []
-        with open(filepath, 'r', encoding='utf-8') as f: content = f.read()
-        if not content.strip(): return []
-        data = json.loads(content)
+        if use_mmap is None: use_mmap = os.path.getsize(filepath) >= JSON_MMAP_THRESHOLD
+        for item in _iter_json_array(filepath, use_mmap=use_mmap, progress_callback=progress_callback):
+            record = _convert_record(item, filepath)
+            if record is not None: processed_data.append(record)
+        perf_count('records_loaded', len(processed_data))
     except (IOError, json.JSONDecodeError) as e: print(f"Error loading {filepath}: {e}"); messagebox.showerror("Data Load Error", f"Could not load {os.path.basename(filepath)}.\nCheck console.", icon='warning'); return []
     except Exception as e: print(f"Unexpected error loading {filepath}: {e}"); traceback.print_exc(); messagebox.showerror("Data Load Error", f"Unexpected error loading {os.path.basename(filepath)}.\nCheck console.", icon='warning'); return []
-    processed_data = []
-    for item in data:
-        new_item = item.copy()
-        try:
-            if 'id' in new_item and new_item['id'] is not None: new_item['id'] = int(new_item['id'])
-            if 'invoice_id' in new_item and new_item['invoice_id'] is not None: new_item['invoice_id'] = int(new_item['invoice_id'])
-            if 'supplier_invoice_id' in new_item and new_item['supplier_invoice_id'] is not None: new_item['supplier_invoice_id'] = int(new_item['supplier_invoice_id'])
-            # Ensure 'quantity' and 'value' (for inventory) are Decimal
-            # Other financial fields are already covered
-            for key in ['price', 'value', 'amount', 'total_amount', 'quantity', 'amount_paid']:
-                if key in new_item and new_item[key] is not None:
-                    try: new_item[key] = Decimal(str(new_item[key]))
-                    except InvalidOperation: print(f"Warn: Invalid Decimal for '{key}' in {filepath}, ID {new_item.get('id', 'N/A')}: '{new_item[key]}'. Setting to 0."); new_item[key] = ZERO_DECIMAL
-            processed_data.append(new_item)
-        except (ValueError, TypeError) as conv_e: print(f"Warn: Skipping record due to conversion error in {filepath}: {item} - Error: {conv_e}")
+    if on_record:
+        for record in processed_data: on_record(record)
     return processed_data
 
-def save_data(data_list, filepath):
+def _bump_data_version():
+    global DATA_VERSION
+    with _SAVE_LOCK: DATA_VERSION += 1
+
+@instrumented('save_data')
+def save_data(data_list, filepath, show_errors=True):
+    """
+    Write data_list to filepath. Writes are serialised, and each one snapshots the list under the lock, so a later
+    write always holds the newer state. Worker threads pass show_errors=False and report failures themselves.
+    """
     try:
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, 'w', encoding='utf-8') as f: json.dump(data_list, f, cls=DecimalEncoder, indent=4)
+        with _SAVE_LOCK:
+            with open(filepath, 'w', encoding='utf-8') as f: json.dump(list(data_list), f, cls=DecimalEncoder, indent=4)
+            _bump_data_version()
+        if PERF_METRICS_ENABLED: record_perf_bytes('save_data', os.path.getsize(filepath))
         return True
-    except (IOError, TypeError) as e: print(f"Error saving to {filepath}: {e}"); traceback.print_exc(); messagebox.showerror("Data Save Error", f"Could not save to {os.path.basename(filepath)}.\nCheck logs.", icon='error'); return False
-    except Exception as e: print(f"Unexpected error saving to {filepath}: {e}"); traceback.print_exc(); messagebox.showerror("Data Save Error", f"Unexpected error saving {os.path.basename(filepath)}.\nCheck logs.", icon='error'); return False
+    except (IOError, TypeError) as e:
+        print(f"Error saving to {filepath}: {e}"); traceback.print_exc()
+        if show_errors: messagebox.showerror("Data Save Error", f"Could not save to {os.path.basename(filepath)}.\nCheck logs.", icon='error')
+        return False
+    except Exception as e:
+        print(f"Unexpected error saving to {filepath}: {e}"); traceback.print_exc()
+        if show_errors: messagebox.showerror("Data Save Error", f"Unexpected error saving {os.path.basename(filepath)}.\nCheck logs.", icon='error')
+        return False
+
+def _inventory_key(item_name): return (item_name or '').strip().lower()
+
+def _index_inventory_item(record): INVENTORY_BY_NAME.setdefault(_inventory_key(record.get('item_name')), record) # First match wins, as with a linear scan
+
+def _index_invoice_item(record): INVOICE_ITEMS_BY_INVOICE.setdefault(record.get('invoice_id'), []).append(record)
 
-def load_all_data():
+def _index_supplier_invoice_item(record): SUPPLIER_INVOICE_ITEMS_BY_INVOICE.setdefault(record.get('supplier_invoice_id'), []).append(record)
+
+@instrumented('load_all_data')
+def load_all_data(progress_callback=None):
+    """
+    Load every collection file, then build the lookup indexes from each file's records once it has decoded completely,
+    so a file that fails to load leaves no index entries behind.
+    progress_callback, if given, is called as progress_callback(filename, bytes_done, total_bytes) across all files.
+    """
     global USERS_DATA, INVOICES_DATA, INVOICE_ITEMS_DATA, SUPPLIER_INVOICES_DATA, SUPPLIER_INVOICE_ITEMS_DATA, INVENTORY_DATA, PAYMENTS_DATA, COMPANY_SETTINGS
     print("Loading data..."); USERS_DATA.clear(); INVOICES_DATA.clear(); INVOICE_ITEMS_DATA.clear(); SUPPLIER_INVOICES_DATA.clear(); SUPPLIER_INVOICE_ITEMS_DATA.clear(); INVENTORY_DATA.clear(); PAYMENTS_DATA.clear(); COMPANY_SETTINGS.clear()
-    USERS_DATA.extend(load_data(USERS_FILE)); INVOICES_DATA.extend(load_data(INVOICES_FILE)); INVOICE_ITEMS_DATA.extend(load_data(INVOICE_ITEMS_FILE)); SUPPLIER_INVOICES_DATA.extend(load_data(SUPPLIER_INVOICES_FILE)); SUPPLIER_INVOICE_ITEMS_DATA.extend(load_data(SUPPLIER_INVOICE_ITEMS_FILE))
-    INVENTORY_DATA.extend(load_data(INVENTORY_FILE)) # Load inventory data
-    PAYMENTS_DATA.extend(load_data(PAYMENTS_FILE))
+    INVOICE_ITEMS_BY_INVOICE.clear(); SUPPLIER_INVOICE_ITEMS_BY_INVOICE.clear(); INVENTORY_BY_NAME.clear()
+    collections_to_load = [(USERS_DATA, USERS_FILE, None), (INVOICES_DATA, INVOICES_FILE, None), (INVOICE_ITEMS_DATA, INVOICE_ITEMS_FILE, _index_invoice_item),
+                           (SUPPLIER_INVOICES_DATA, SUPPLIER_INVOICES_FILE, None), (SUPPLIER_INVOICE_ITEMS_DATA, SUPPLIER_INVOICE_ITEMS_FILE, _index_supplier_invoice_item),
+                           (INVENTORY_DATA, INVENTORY_FILE, _index_inventory_item), (PAYMENTS_DATA, PAYMENTS_FILE, None)]
+    file_sizes = [os.path.getsize(path) if os.path.exists(path) else 0 for _, path, _ in collections_to_load]
+    total_bytes = sum(file_sizes); bytes_before = 0
+    for (data_list, path, on_record), file_size in zip(collections_to_load, file_sizes):
+        file_progress = None
+        if progress_callback:
+            file_progress = lambda done, _total, base=bytes_before, name=os.path.basename(path): progress_callback(name, base + done, total_bytes)
+        data_list.extend(load_data(path, on_record=on_record, progress_callback=file_progress))
+        bytes_before += file_size
+    _bump_data_version(); mark_chart_periods_dirty('customer'); mark_chart_periods_dirty('supplier'); rebuild_party_rollups()
     load_settings(); print(f"Data loaded: {len(USERS_DATA)}u, {len(INVOICES_DATA)}inv, {len(SUPPLIER_INVOICES_DATA)}bill, {len(INVENTORY_DATA)}ity, {len(PAYMENTS_DATA)}pay."); print(f"Settings: Name='{COMPANY_SETTINGS.get('company_name', 'N/A')}'")
 
+def load_all_data_with_splash(root):
+    """Run load_all_data() behind a small progress window so large data sets don't look like a hang."""
+    splash = tk.Toplevel(root); splash.title("Eaze Inn Accounts"); splash.resizable(False, False)
+    ttk.Label(splash, text="Loading data...", font=('TkDefaultFont', 10, 'bold')).pack(padx=20, pady=(15, 5))
+    progress_bar = ttk.Progressbar(splash, orient="horizontal", length=300, mode="determinate", maximum=100); progress_bar.pack(padx=20, pady=5)
+    status_label = ttk.Label(splash, text=""); status_label.pack(padx=20, pady=(0, 15))
+    def on_progress(filename, bytes_done, total_bytes):
+        progress_bar['value'] = (bytes_done * 100 / total_bytes) if total_bytes else 100
+        status_label.config(text=f"Reading {filename}..."); splash.update()
+    try: splash.update(); load_all_data(progress_callback=on_progress)
+    finally: splash.destroy()
 
+
+def allocate_id_block(data_list, count):
+    """Reserve `count` consecutive ids after the highest id in data_list with a single scan."""
+    first_id = get_next_id(data_list)
+    return range(first_id, first_id + count)
+
+@instrumented('get_next_id')
 def get_next_id(data_list):
     if not data_list: return 1
     max_id = 0
@@ -258,15 +581,18 @@ def format_percentage_diff(current, previous):
     except (InvalidOperation, TypeError, ValueError): return "N/A"
 
 # --- Inventory Update Logic ---
-def update_inventory_after_transaction(transaction_type, processed_items):
+@instrumented('update_inventory')
+def update_inventory_after_transaction(transaction_type, processed_items, save=True):
     global INVENTORY_DATA
+    perf_count('inventory_movements', len(processed_items))
     inventory_changed = False
+    next_inventory_id = None # Allocated once, then counted up, so new items don't rescan INVENTORY_DATA each time
     for proc_item in processed_items:
         item_name = proc_item['item'].strip()
         quantity_change = proc_item['quantity']  # Expected to be Decimal
         price_per_unit = proc_item['price']      # Expected to be Decimal
 
-        inventory_item = next((inv_item for inv_item in INVENTORY_DATA if inv_item.get('item_name', '').strip().lower() == item_name.lower()), None)
+        inventory_item = INVENTORY_BY_NAME.get(_inventory_key(item_name))
 
         if transaction_type == 'supplier':  # Purchase
             if inventory_item:
@@ -277,7 +603,8 @@ def update_inventory_after_transaction(transaction_type, processed_items):
                 inventory_item['last_updated'] = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 print(f"Inventory Update (Purchase): '{item_name}' old_qty: {old_quantity}, added: {quantity_change}, new_qty: {new_quantity}, new_cost: {price_per_unit}")
             else:
-                new_id = get_next_id(INVENTORY_DATA)
+                if next_inventory_id is None: next_inventory_id = get_next_id(INVENTORY_DATA)
+                new_id = next_inventory_id; next_inventory_id += 1
                 inventory_item_new = {
                     'id': new_id,
                     'item_name': item_name,
@@ -285,7 +612,7 @@ def update_inventory_after_transaction(transaction_type, processed_items):
                     'value': price_per_unit,
                     'last_updated': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 }
-                INVENTORY_DATA.append(inventory_item_new)
+                INVENTORY_DATA.append(inventory_item_new); _index_inventory_item(inventory_item_new)
                 print(f"Inventory Add (Purchase): '{item_name}' qty: {quantity_change}, cost: {price_per_unit}")
             inventory_changed = True
 
@@ -299,7 +626,8 @@ def update_inventory_after_transaction(transaction_type, processed_items):
                 print(f"Inventory Update (Sale): '{item_name}' old_qty: {old_quantity}, sold: {quantity_change}, new_qty: {new_quantity}")
                 inventory_changed = True
             else: # Item sold but not in inventory
-                new_id = get_next_id(INVENTORY_DATA)
+                if next_inventory_id is None: next_inventory_id = get_next_id(INVENTORY_DATA)
+                new_id = next_inventory_id; next_inventory_id += 1
                 inventory_item_new = {
                     'id': new_id,
                     'item_name': item_name,
@@ -308,11 +636,11 @@ def update_inventory_after_transaction(transaction_type, processed_items):
                     'last_updated': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                     'status_flag': 'SOLD_WITHOUT_STOCK' # Custom flag
                 }
-                INVENTORY_DATA.append(inventory_item_new)
+                INVENTORY_DATA.append(inventory_item_new); _index_inventory_item(inventory_item_new)
                 print(f"Inventory Alert (Sale): Item '{item_name}' sold without prior stock. Added with negative quantity.")
                 inventory_changed = True
     
-    if inventory_changed:
+    if inventory_changed and save:
         if not save_data(INVENTORY_DATA, INVENTORY_FILE):
             print("CRITICAL: FAILED TO SAVE INVENTORY UPDATES TO FILE.")
             messagebox.showerror("Inventory Save Error", 
@@ -382,6 +710,7 @@ def signin_window(root):
     password_entry.bind("<Return>", lambda event: signin_command())
 
 # --- Backup/Restore Functions ---
+@instrumented('backup')
 def backup_all_data_threaded(result_queue):
     source_dir = DATA_DIR; backup_base_dir = "eaze_inn_json_backup"
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -390,6 +719,7 @@ def backup_all_data_threaded(result_queue):
         if not os.path.isdir(source_dir): result_queue.put(("Warning", f"Data dir '{source_dir}' not found.")); return
         os.makedirs(backup_base_dir, exist_ok=True)
         shutil.copytree(source_dir, backup_dest_dir)
+        if PERF_METRICS_ENABLED: record_perf_bytes('backup', _dir_size(backup_dest_dir))
         result_queue.put(("Success", f"Backup successful!\nSaved in:\n{os.path.abspath(backup_dest_dir)}"))
     except Exception as e: result_queue.put(("Error", f"Backup failed: {e}\n{traceback.format_exc()}"))
 
@@ -400,6 +730,7 @@ def backup_all_data(root):
     thread.start()
     root.after(100, lambda: check_thread_queue(root, result_queue, "Backup"))
 
+@instrumented('restore')
 def restore_all_data_threaded(restore_source_dir, result_queue):
     target_dir = DATA_DIR; pre_restore_base_dir = "pre_restore_json_backups"
     try:
@@ -415,6 +746,7 @@ def restore_all_data_threaded(restore_source_dir, result_queue):
             except Exception as rm_err: result_queue.put(("Error", f"Failed remove current dir '{target_dir}': {rm_err}\nAbort.")); return
         try:
             shutil.copytree(restore_source_dir, target_dir)
+            if PERF_METRICS_ENABLED: record_perf_bytes('restore', _dir_size(target_dir))
             result_queue.put(("Success", f"Data restored from:\n{os.path.basename(restore_source_dir)}\n\nRestart required."))
         except Exception as copy_err:
             result_queue.put(("Error", f"Failed copy backup to '{target_dir}': {copy_err}\nRestore failed."))
@@ -455,6 +787,255 @@ def check_thread_queue(root, result_queue, operation_name):
     except queue.Empty: root.after(100, lambda: check_thread_queue(root, result_queue, operation_name))
     except Exception as e: messagebox.showerror("Queue Check Error", f"Error checking {operation_name} result: {e}", parent=root)
 
+# --- Bulk Import ---
+def _normalise_import_header(header): return str(header or '').strip().lower().replace(' ', '_')
+
+_IMPORT_HEADER_LOOKUP = {alias: column for column, aliases in IMPORT_COLUMN_ALIASES.items() for alias in aliases}
+
+def _import_column_map(headers):
+    """Map each file header to its canonical column name; unknown headers map to None and are ignored."""
+    return [_IMPORT_HEADER_LOOKUP.get(_normalise_import_header(header)) for header in headers]
+
+def _import_record(columns, values):
+    """{canonical column: value}; when several headers alias one column (invoice_no, bill_no) the first non-empty value wins."""
+    record = {}
+    for column, value in zip(columns, values):
+        if column and (column not in record or (record[column] in (None, '') and value not in (None, ''))): record[column] = value
+    return record
+
+def iter_import_rows(filepath):
+    """Yield (line_number, {canonical column: value}) from a CSV, XLSX or JSON (array of objects) file without loading it whole."""
+    extension = os.path.splitext(filepath)[1].lower()
+    if extension == '.csv':
+        with open(filepath, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.reader(f); columns = _import_column_map(next(reader, []))
+            for line_number, values in enumerate(reader, 2):
+                if any(str(value).strip() for value in values): yield line_number, _import_record(columns, values)
+    elif extension == '.xlsx':
+        workbook = load_workbook(filepath, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True); columns = _import_column_map(next(rows, ()))
+            for line_number, values in enumerate(rows, 2):
+                if any(value not in (None, '') for value in values): yield line_number, _import_record(columns, values)
+        finally: workbook.close()
+    elif extension == '.json':
+        for line_number, record in enumerate(_iter_json_array(filepath), 1):
+            if not isinstance(record, dict): yield line_number, {}; continue
+            columns = _import_column_map(record.keys())
+            yield line_number, _import_record(columns, record.values())
+    else: raise ValueError(f"Unsupported import file type '{extension}'. Use CSV, XLSX or JSON.")
+
+_IMPORT_GROUPED_NUMBER = re.compile(r'[+-]?\d{1,3}(,\d{3})+(\.\d+)?') # 1,234,567.89; any other comma is ambiguous (decimal comma?)
+
+def _parse_import_decimal(value, label):
+    if value is None or str(value).strip() == '': raise ValueError(f"Missing {label}")
+    text = str(value).replace(CURRENCY_SYMBOL, '').strip()
+    if ',' in text:
+        if not _IMPORT_GROUPED_NUMBER.fullmatch(text): raise ValueError(f"Invalid {label} '{value}' (commas are only allowed as thousands separators)")
+        text = text.replace(',', '')
+    try: number = Decimal(text)
+    except InvalidOperation: raise ValueError(f"Invalid {label} '{value}'")
+    if not number.is_finite(): raise ValueError(f"Invalid {label} '{value}'")
+    return number
+
+def _import_group_key(row, default_type=None):
+    """(invoice_type, party, ref) of the invoice/bill a row belongs to, or None when the row doesn't say. Bill numbers are only unique per supplier."""
+    invoice_type = IMPORT_TYPE_ALIASES.get(str(row.get('type') or default_type or '').strip().lower())
+    party = str(row.get('party') or '').strip(); ref = str(row.get('ref') or '').strip()
+    return (invoice_type, party, ref) if invoice_type and party and ref else None
+
+def _parse_import_row(row, default_type=None):
+    """Validate one import row the way the invoice window does. Returns (invoice_type, ref, date, party, status, item) or raises ValueError."""
+    invoice_type = IMPORT_TYPE_ALIASES.get(str(row.get('type') or default_type or '').strip().lower())
+    if not invoice_type: raise ValueError(f"Unknown type '{row.get('type', '')}' (use customer or supplier)")
+    ref = str(row.get('ref') or '').strip()
+    if not ref: raise ValueError("Missing invoice/bill number")
+    party = str(row.get('party') or '').strip()
+    if not party: raise ValueError("Missing customer/supplier name")
+    raw_date = row.get('date')
+    if isinstance(raw_date, (datetime.datetime, datetime.date)): invoice_date = raw_date.strftime(DATE_FORMAT)
+    else:
+        try: invoice_date = datetime.datetime.strptime(str(raw_date or '').strip(), DATE_FORMAT).strftime(DATE_FORMAT)
+        except ValueError: raise ValueError(f"Invalid date '{raw_date}' (use YYYY-MM-DD)")
+    item_name = str(row.get('item') or '').strip()
+    if not item_name: raise ValueError("Missing item name")
+    qty = _parse_import_decimal(row.get('quantity'), "quantity")
+    price = _parse_import_decimal(row.get('price'), "price")
+    if qty <= 0: raise ValueError("Quantity must be positive")
+    if price < 0: raise ValueError("Price cannot be negative")
+    status = IMPORT_STATUS_ALIASES.get(str(row.get('payment_status') or '').strip().lower())
+    if status is None: raise ValueError(f"Unknown payment status '{row.get('payment_status')}' (use pending/unpaid/P or paid/cleared/C)")
+    return invoice_type, ref, invoice_date, party, status, {'item': item_name, 'quantity': qty, 'price': price}
+
+def _imported_refs(invoice_type):
+    """(party, original number) of the invoices/bills already brought in by earlier imports."""
+    party_key = 'customer_name' if invoice_type == 'customer' else 'supplier_name'
+    return {(invoice.get(party_key), invoice['import_ref']) for invoice in list(INVOICES_DATA if invoice_type == 'customer' else SUPPLIER_INVOICES_DATA) if invoice.get('import_ref')}
+
+@instrumented('bulk_import_stage')
+def stage_bulk_import(filepath, rejects_path=None, default_type=None, progress=None):
+    """
+    Stream and validate an import file into a staged batch without touching the live data.
+    Lines sharing a (type, party, number) become one invoice/bill, which keeps the number as 'import_ref'; numbers
+    imported before for that party are rejected so re-importing a file adds nothing. An invoice/bill is all or nothing:
+    one bad line rejects every line of it, so the corrected rejects file can be imported again.
+    Every rejected line is written to rejects_path (CSV) if given.
+    progress, if given, is a dict whose 'rows_read' is updated as the file is read (safe to poll from the UI thread).
+    """
+    start = time.perf_counter()
+    batch = {'filepath': filepath, 'invoices': {'customer': {}, 'supplier': {}}, 'items': {'customer': [], 'supplier': []},
+             'rows_read': 0, 'rows_accepted': 0, 'rejected_count': 0, 'rejected': [], 'rejects_path': rejects_path}
+    existing_refs = {'customer': _imported_refs('customer'), 'supplier': _imported_refs('supplier')}
+    bad_groups = {} # (type, party, ref) -> (first bad line, reason); its earlier, valid lines are rejected after the pass
+    rejects_file = open(rejects_path, 'w', encoding='utf-8', newline='') if rejects_path else None
+    try:
+        rejects_writer = csv.writer(rejects_file) if rejects_file else None
+        if rejects_writer: rejects_writer.writerow(["line", "reason", "row"])
+        def reject(line_number, reason, row):
+            batch['rejected_count'] += 1
+            if len(batch['rejected']) < IMPORT_MAX_REJECT_DETAILS: batch['rejected'].append((line_number, reason))
+            if rejects_writer: rejects_writer.writerow([line_number, reason, json.dumps(row, default=str, ensure_ascii=False)])
+        for line_number, row in iter_import_rows(filepath):
+            batch['rows_read'] += 1
+            if progress is not None and batch['rows_read'] % 1000 == 0: progress['rows_read'] = batch['rows_read']
+            group = _import_group_key(row, default_type)
+            try:
+                if group in bad_groups: raise ValueError(f"Line {bad_groups[group][0]} of {group[0]} #{group[2]} ({group[1]}) was rejected")
+                invoice_type, ref, invoice_date, party, status, item = _parse_import_row(row, default_type)
+                party_key = 'customer_name' if invoice_type == 'customer' else 'supplier_name'
+                if (party, ref) in existing_refs[invoice_type]: raise ValueError(f"{invoice_type.capitalize()} #{ref} ({party}) was already imported")
+                invoice = batch['invoices'][invoice_type].get((party, ref))
+                if invoice is None:
+                    invoice = batch['invoices'][invoice_type][(party, ref)] = {'id': None, 'date': invoice_date, party_key: party, 'payment_status': status, 'import_ref': ref}
+                elif invoice['date'] != invoice_date or invoice['payment_status'] != status:
+                    raise ValueError(f"Conflicts with earlier lines of {invoice_type} #{ref} ({party}, {invoice['date']}, status {invoice['payment_status']})")
+                batch['items'][invoice_type].append((invoice, item)); batch['rows_accepted'] += 1
+            except ValueError as e:
+                if group is not None and group not in bad_groups: bad_groups[group] = (line_number, str(e))
+                reject(line_number, str(e), row)
+        if bad_groups: # Drop the partly staged invoices/bills, then re-read the file for their lines accepted before the bad one
+            for invoice_type in ('customer', 'supplier'):
+                invoices = batch['invoices'][invoice_type]; party_key = 'customer_name' if invoice_type == 'customer' else 'supplier_name'
+                for key in [key for key in invoices if (invoice_type,) + key in bad_groups]: del invoices[key]
+                kept = [(invoice, item) for invoice, item in batch['items'][invoice_type] if (invoice[party_key], invoice['import_ref']) in invoices]
+                batch['rows_accepted'] -= len(batch['items'][invoice_type]) - len(kept); batch['items'][invoice_type] = kept
+            for line_number, row in iter_import_rows(filepath):
+                group = _import_group_key(row, default_type)
+                if group in bad_groups and line_number < bad_groups[group][0]:
+                    reject(line_number, f"Line {bad_groups[group][0]} of {group[0]} #{group[2]} ({group[1]}) was rejected: {bad_groups[group][1]}", row)
+            batch['rejected'].sort()
+    finally:
+        if rejects_file: rejects_file.close()
+    if progress is not None: progress['rows_read'] = batch['rows_read']
+    batch['stage_s'] = time.perf_counter() - start
+    return batch
+
+def _summarise_stock_movements(staged_items):
+    """Collapse staged lines to one movement per item (total quantity, latest price) for a single inventory posting."""
+    movements = {}
+    for _, item in staged_items:
+        key = _inventory_key(item['item'])
+        if key in movements: movements[key]['quantity'] += item['quantity']; movements[key]['price'] = item['price']
+        else: movements[key] = dict(item)
+    return list(movements.values())
+
+@instrumented('bulk_import_apply')
+def apply_bulk_import(batch):
+    """
+    Append a staged batch to the live data with block-allocated ids and post stock in one pass per type.
+    Purchases are posted before sales so items bought within the batch are in stock when their sales are applied.
+    Mutates the shared lists, indexes and rollups, so it must run on the Tk thread; returns the (data list, file) pairs
+    for save_bulk_import. Raises ValueError, before changing anything, if a number was imported since the batch was staged.
+    """
+    for invoice_type in ('customer', 'supplier'):
+        clashes = _imported_refs(invoice_type).intersection(batch['invoices'][invoice_type])
+        if clashes:
+            party, ref = min(clashes)
+            raise ValueError(f"{len(clashes):,} {invoice_type} numbers were imported meanwhile (e.g. #{ref} for {party}). Import the file again.")
+    start = time.perf_counter(); files = []
+    for invoice_type in ('supplier', 'customer'):
+        invoices = list(batch['invoices'][invoice_type].values()); staged_items = batch['items'][invoice_type]
+        if not invoices: continue
+        if invoice_type == 'customer':
+            invoice_list, invoice_file, item_list, item_file, invoice_key, index_item = INVOICES_DATA, INVOICES_FILE, INVOICE_ITEMS_DATA, INVOICE_ITEMS_FILE, 'invoice_id', _index_invoice_item
+        else:
+            invoice_list, invoice_file, item_list, item_file, invoice_key, index_item = SUPPLIER_INVOICES_DATA, SUPPLIER_INVOICES_FILE, SUPPLIER_INVOICE_ITEMS_DATA, SUPPLIER_INVOICE_ITEMS_FILE, 'supplier_invoice_id', _index_supplier_invoice_item
+        for invoice, new_id in zip(invoices, allocate_id_block(invoice_list, len(invoices))): invoice['id'] = new_id
+        invoice_list.extend(invoices)
+        for (invoice, item), item_id in zip(staged_items, allocate_id_block(item_list, len(staged_items))):
+            item_record = {'id': item_id, invoice_key: invoice['id'], **item}
+            item_list.append(item_record); index_item(item_record)
+        for invoice in invoices: mark_chart_periods_dirty(invoice_type, invoice['date'], invoice['id'])
+        for invoice in invoices: rollup_add_invoice(invoice_type, invoice)
+        update_inventory_after_transaction(invoice_type, _summarise_stock_movements(staged_items), save=False)
+        files += [(invoice_list, invoice_file), (item_list, item_file)]
+    if batch['rows_accepted']: files.append((INVENTORY_DATA, INVENTORY_FILE))
+    _bump_data_version() # Caches must not serve pre-import results while the files are still being written
+    batch['commit_s'] = time.perf_counter() - start
+    return files
+
+@instrumented('bulk_import_save')
+def save_bulk_import(batch, files, show_errors=True):
+    """Write each file touched by apply_bulk_import once. Safe on a worker thread with show_errors=False."""
+    start = time.perf_counter(); saved = True
+    for data_list, filepath in files: saved = save_data(data_list, filepath, show_errors) and saved
+    batch['commit_s'] = batch.get('commit_s', 0.0) + time.perf_counter() - start
+    return saved
+
+def commit_bulk_import(batch):
+    """Apply and save a staged batch in one go, for callers already on the Tk thread (or with no UI at all)."""
+    return save_bulk_import(batch, apply_bulk_import(batch))
+
+def bulk_import_report(batch):
+    elapsed = batch.get('stage_s', 0.0) + batch.get('commit_s', 0.0)
+    rows_per_sec = batch['rows_read'] / elapsed if elapsed else 0.0
+    lines = [f"Rows read: {batch['rows_read']:,}  ({rows_per_sec:,.0f} rows/sec)",
+             f"Imported: {len(batch['invoices']['customer']):,} invoices, {len(batch['invoices']['supplier']):,} bills, {batch['rows_accepted']:,} lines",
+             f"Rejected: {batch['rejected_count']:,} rows"]
+    for line_number, reason in batch['rejected'][:10]: lines.append(f"  Line {line_number}: {reason}")
+    if batch['rejected_count'] > 10 and batch['rejects_path']: lines.append(f"All rejected rows: {os.path.abspath(batch['rejects_path'])}")
+    return "\n".join(lines)
+
+def bulk_import_threaded(filepath, rejects_path, progress, result_queue):
+    try: result_queue.put(("Staged", stage_bulk_import(filepath, rejects_path, progress=progress)))
+    except Exception as e: result_queue.put(("Error", f"Import failed: {e}\n{traceback.format_exc()}"))
+
+def save_bulk_import_threaded(batch, files, result_queue):
+    try:
+        if save_bulk_import(batch, files, show_errors=False): result_queue.put(("Success", bulk_import_report(batch)))
+        else: result_queue.put(("Error", "Imported rows are in memory but could not all be saved.\nCheck console logs."))
+    except Exception as e: result_queue.put(("Error", f"Import save failed: {e}\n{traceback.format_exc()}"))
+
+def bulk_import(root):
+    filepath = filedialog.askopenfilename(title="Select Invoices/Bills to Import", filetypes=IMPORT_FILE_TYPES, parent=root)
+    if not filepath: return
+    rejects_path = os.path.splitext(filepath)[0] + "_rejected.csv"
+    progress_win = tk.Toplevel(root); progress_win.title("Bulk Import"); progress_win.transient(root); progress_win.resizable(False, False)
+    ttk.Label(progress_win, text=f"Reading {os.path.basename(filepath)}...").pack(padx=20, pady=(15, 5))
+    progress_bar = ttk.Progressbar(progress_win, mode="indeterminate", length=300); progress_bar.pack(padx=20, pady=5); progress_bar.start(10)
+    status_label = ttk.Label(progress_win, text="0 rows read"); status_label.pack(padx=20, pady=(0, 15))
+    progress = {'rows_read': 0}; result_queue = queue.Queue()
+    threading.Thread(target=bulk_import_threaded, args=(filepath, rejects_path, progress, result_queue), daemon=True).start()
+    def poll_import():
+        try: status, payload = result_queue.get_nowait()
+        except queue.Empty:
+            status_label.config(text=f"{progress['rows_read']:,} rows read"); root.after(200, poll_import); return
+        progress_win.destroy()
+        if status != "Staged": messagebox.showerror("Import Error", payload, parent=root); return
+        batch = payload
+        if not batch['rows_accepted']: messagebox.showwarning("Import", "Nothing to import.\n\n" + bulk_import_report(batch), parent=root); return
+        if not messagebox.askyesno("Confirm Import", bulk_import_report(batch) + "\n\nImport the valid rows now?", parent=root): return
+        # The merge touches the shared lists, indexes and rollups, so it stays on the Tk thread; only the file writes
+        # (the slow part on large imports, serialised with other saves by save_data) go to a worker
+        root.config(cursor="watch"); root.update_idletasks()
+        try: files = apply_bulk_import(batch)
+        except ValueError as e: messagebox.showerror("Import Error", str(e), parent=root); return
+        finally: root.config(cursor="")
+        save_queue = queue.Queue()
+        threading.Thread(target=save_bulk_import_threaded, args=(batch, files, save_queue), daemon=True).start()
+        root.after(200, lambda: check_thread_queue(root, save_queue, "Import"))
+    root.after(200, poll_import)
+
 # --- PDF/Excel Generation ---
 class QRCodeFlowable(Flowable):
     def __init__(self, qr_path, width, height): Flowable.__init__(self); self.qr_path = qr_path; self.width = width; self.height = height
@@ -463,6 +1044,7 @@ class QRCodeFlowable(Flowable):
         except FileNotFoundError: print(f"QR Code image not found: {self.qr_path}")
         except Exception as e: print(f"Error drawing QR Code: {e}")
 
+@instrumented('pdf_build')
 def generate_pdf_invoice_threaded(invoice_id, invoice_type, entity_name, invoice_data, invoice_items_dec, result_queue):
     global COMPANY_SETTINGS; entity_label = invoice_type.capitalize()
     pdf_file = f"{invoice_type}_{entity_name.replace(' ','_')}_{invoice_id}_{datetime.datetime.now().strftime('%Y%m%d')}.pdf"
@@ -502,35 +1084,585 @@ def generate_pdf_invoice_threaded(invoice_id, invoice_type, entity_name, invoice
         totals_data = [['', '', Paragraph('<b>Total Amount:</b>', styles['Normal']), Paragraph(f"<b>{format_currency(total_amount)}</b>", styles['Normal'])]]; totals_table = Table(totals_data, colWidths=[3.5*inch + 0.7*inch, 1.0*inch, 1.1*inch]); totals_table.setStyle(TableStyle([('ALIGN', (0, 0), (-1, -1), 'RIGHT'), ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'), ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'), ('FONTSIZE', (0, 0), (-1, -1), 10), ('BOTTOMPADDING', (0, 0), (-1, -1), 5), ('TOPPADDING', (0, 0), (-1, -1), 5)])); story.append(totals_table); story.append(Spacer(1, 0.3*inch))
         story.append(Paragraph("<u>Terms & Conditions:</u>", styles['h4'])); story.append(Paragraph("1. Goods once sold will not be taken back.", styles['small'])); story.append(Paragraph("2. Interest @18% p.a. charged if bill not paid within 30 days.", styles['small'])); story.append(Paragraph("3. Subject to Jalandhar jurisdiction only.", styles['small'])); story.append(Spacer(1, 0.5*inch)); story.append(Paragraph(f"For {company_name}", styles['Normal'])); story.append(Spacer(1, 0.5*inch)); story.append(Paragraph("Authorised Signatory", styles['Normal']))
         pdf.build(story)
+        if PERF_METRICS_ENABLED: record_perf_bytes('pdf_build', os.path.getsize(pdf_file))
         # On success, put the FULL PATH into the queue
         result_queue.put(("Success", os.path.abspath(pdf_file)))
     except Exception as e: result_queue.put(("Error", f"PDF generation failed: {e}\n{traceback.format_exc()}"))
 
+@instrumented('invoice_total')
 def calculate_invoice_total(invoice_id, invoice_type):
     """
     Calculate the total amount for a given invoice (customer or supplier).
     """
     total = ZERO_DECIMAL
-    if invoice_type == 'customer':
-        for item in INVOICE_ITEMS_DATA:
-            if item.get('invoice_id') == invoice_id:
-                qty = item.get('quantity', ZERO_DECIMAL)
-                price = item.get('price', ZERO_DECIMAL)
-                try:
-                    total += qty * price
-                except Exception:
-                    continue
-    else:  # supplier
-        for item in SUPPLIER_INVOICE_ITEMS_DATA:
-            if item.get('supplier_invoice_id') == invoice_id:
-                qty = item.get('quantity', ZERO_DECIMAL)
-                price = item.get('price', ZERO_DECIMAL)
-                try:
-                    total += qty * price
-                except Exception:
-                    continue
+    items_index = INVOICE_ITEMS_BY_INVOICE if invoice_type == 'customer' else SUPPLIER_INVOICE_ITEMS_BY_INVOICE
+    for item in items_index.get(invoice_id, ()):
+        qty = item.get('quantity', ZERO_DECIMAL)
+        price = item.get('price', ZERO_DECIMAL)
+        try:
+            total += qty * price
+        except Exception:
+            continue
     return total
 
+# --- EazeBot Charting ---
+_CHART_LOCK = threading.Lock()
+_CHART_IMAGE_CACHE = collections.OrderedDict() # (chart_type, start_month, end_month, DATA_VERSION) -> PNG bytes
+_CHART_PERIODS = {'customer': {}, 'supplier': {}} # month -> {'total', 'items'}; only touched by the chart worker
+_CHART_MONTH_INVOICES = {'customer': {}, 'supplier': {}} # month -> set of invoice ids; only touched by the chart worker
+_CHART_DIRTY = {'customer': None, 'supplier': None} # None = rebuild every month, else month -> invoice ids new to that month
+_CHART_QUEUE = queue.Queue()
+_CHART_WORKER = None
+
+def _month_of(date_str): return str(date_str or '')[:7]
+
+def mark_chart_periods_dirty(invoice_type, date_str=None, invoice_id=None):
+    """
+    Flag the month of date_str for recomputation on the next chart request, registering invoice_id as belonging to it.
+    Without a date every month is rebuilt from a full scan.
+    """
+    with _CHART_LOCK:
+        if date_str is None: _CHART_DIRTY[invoice_type] = None
+        elif _CHART_DIRTY[invoice_type] is not None:
+            invoice_ids = _CHART_DIRTY[invoice_type].setdefault(_month_of(date_str), set())
+            if invoice_id is not None: invoice_ids.add(invoice_id)
+
+def _refresh_chart_periods(invoice_type):
+    """Recompute the monthly aggregates of dirty months from the month -> invoice ids index. Runs on the chart worker."""
+    with _CHART_LOCK: dirty = _CHART_DIRTY[invoice_type]; _CHART_DIRTY[invoice_type] = {}
+    if dirty is not None and not dirty: return
+    periods = _CHART_PERIODS[invoice_type]; month_invoices = _CHART_MONTH_INVOICES[invoice_type]
+    if dirty is None: # Full rebuild: the only path that scans every invoice
+        periods.clear(); month_invoices.clear()
+        for invoice in list(INVOICES_DATA if invoice_type == 'customer' else SUPPLIER_INVOICES_DATA):
+            month_invoices.setdefault(_month_of(invoice.get('date')), set()).add(invoice.get('id'))
+        dirty = month_invoices
+    else:
+        for month, invoice_ids in dirty.items(): month_invoices.setdefault(month, set()).update(invoice_ids)
+    items_index = INVOICE_ITEMS_BY_INVOICE if invoice_type == 'customer' else SUPPLIER_INVOICE_ITEMS_BY_INVOICE
+    for month in list(dirty):
+        if not month_invoices.get(month): periods.pop(month, None); continue
+        period = periods[month] = {'total': ZERO_DECIMAL, 'items': {}}
+        for invoice_id in month_invoices.get(month, ()):
+            for item in items_index.get(invoice_id, ()):
+                try: amount = item.get('quantity', ZERO_DECIMAL) * item.get('price', ZERO_DECIMAL)
+                except Exception: continue
+                item_name = str(item.get('item', '')).strip()
+                period['total'] += amount; period['items'][item_name] = period['items'].get(item_name, ZERO_DECIMAL) + amount
+
+def _monthly_series(invoice_type, start_month, end_month):
+    periods = _CHART_PERIODS[invoice_type]
+    months = sorted(month for month in periods if start_month <= month <= end_month)
+    return months, [float(periods[month]['total']) for month in months]
+
+@instrumented('chart_render')
+def _render_chart_png(chart_type, start_month, end_month):
+    """Build the chart with the Agg canvas (no Tk involved) and return it as PNG bytes."""
+    figure = Figure(figsize=(7, 4), dpi=100); axes = figure.add_subplot(111)
+    has_data = False
+    if chart_type == "Top Items (Sales)":
+        item_totals = collections.Counter()
+        for month, period in _CHART_PERIODS['customer'].items():
+            if start_month <= month <= end_month: item_totals.update(period['items'])
+        top_items = item_totals.most_common(CHART_TOP_ITEMS)[::-1]
+        if top_items:
+            has_data = True; axes.barh([name for name, _ in top_items], [float(amount) for _, amount in top_items], color="tab:blue")
+            axes.set_xlabel(f"Sales ({CURRENCY_SYMBOL})")
+    elif chart_type == "Sales vs Purchases":
+        for invoice_type, label, color in (('customer', "Sales", "tab:blue"), ('supplier', "Purchases", "tab:red")):
+            months, totals = _monthly_series(invoice_type, start_month, end_month)
+            if months: has_data = True; axes.plot(months, totals, marker='o', label=label, color=color)
+        if has_data: axes.legend(); axes.set_ylabel(CURRENCY_SYMBOL)
+    else:
+        invoice_type = 'customer' if chart_type == "Monthly Sales" else 'supplier'
+        months, totals = _monthly_series(invoice_type, start_month, end_month)
+        if months: has_data = True; axes.bar(months, totals, color="tab:blue" if invoice_type == 'customer' else "tab:red"); axes.set_ylabel(CURRENCY_SYMBOL)
+    if not has_data: axes.text(0.5, 0.5, "No data for this period", ha='center', va='center', transform=axes.transAxes); axes.set_axis_off()
+    else: axes.tick_params(axis='x', labelrotation=45)
+    axes.set_title(f"{chart_type} ({start_month} to {end_month})"); figure.tight_layout()
+    buffer = io.BytesIO(); FigureCanvasAgg(figure).print_png(buffer)
+    return buffer.getvalue()
+
+def _chart_worker():
+    while True:
+        key, result_queue = _CHART_QUEUE.get()
+        try:
+            with _CHART_LOCK: png_bytes = _CHART_IMAGE_CACHE.get(key) # A queued duplicate may already be rendered
+            if png_bytes is None:
+                _refresh_chart_periods('customer'); _refresh_chart_periods('supplier')
+                png_bytes = _render_chart_png(*key[:3])
+                with _CHART_LOCK:
+                    _CHART_IMAGE_CACHE[key] = png_bytes
+                    while len(_CHART_IMAGE_CACHE) > CHART_CACHE_SIZE: _CHART_IMAGE_CACHE.popitem(last=False)
+            result_queue.put(("Success", png_bytes))
+        except Exception as e: result_queue.put(("Error", f"Chart rendering failed: {e}\n{traceback.format_exc()}"))
+
+def request_chart(chart_type, start_month, end_month, result_queue):
+    """Queue a chart for rendering; ("Success", png_bytes) or ("Error", message) arrives on result_queue. Cached charts are answered immediately."""
+    global _CHART_WORKER
+    key = (chart_type, start_month, end_month, DATA_VERSION)
+    with _CHART_LOCK:
+        png_bytes = _CHART_IMAGE_CACHE.get(key)
+        if png_bytes is not None: _CHART_IMAGE_CACHE.move_to_end(key)
+    if png_bytes is not None: perf_count('chart_cache_hits'); result_queue.put(("Success", png_bytes)); return
+    perf_count('chart_cache_misses')
+    if _CHART_WORKER is None or not _CHART_WORKER.is_alive():
+        _CHART_WORKER = threading.Thread(target=_chart_worker, name="ChartWorker", daemon=True); _CHART_WORKER.start()
+    _CHART_QUEUE.put((key, result_queue))
+
+# --- EazeBot Assistant ---
+class StubAssistantBackend:
+    """Offline stand-in for Gemini: sleeps for `latency_s` and echoes the question, for benchmarks and demos."""
+    name = "stub"
+    def __init__(self, latency_s=0.2): self.latency_s = latency_s; self.calls = 0
+    def generate(self, prompt):
+        self.calls += 1; time.sleep(self.latency_s)
+        numbered = _ASSISTANT_QUESTION_TAG.findall(prompt)
+        if numbered: return "\n".join(f"[A{number}] [stub answer #{self.calls}] {question.strip()}" for number, question in numbered)
+        question = prompt.rsplit("Question:", 1)[-1].strip()
+        return f"[stub answer #{self.calls}] {question}"
+
+class GeminiAssistantBackend:
+    name = "gemini"
+    def __init__(self, api_key, model_name=GEMINI_MODEL_NAME):
+        genai.configure(api_key=api_key); self.model = genai.GenerativeModel(model_name)
+    def generate(self, prompt): return self.model.generate_content(prompt).text
+
+_ASSISTANT_LOCK = threading.Lock()
+_ASSISTANT_CACHE = collections.OrderedDict() # (normalised question, DATA_VERSION) -> answer
+_ASSISTANT_SUMMARY = (None, None) # (DATA_VERSION, context text) of the last ledger summary
+_ASSISTANT_QUEUE = queue.Queue()
+_ASSISTANT_WORKER = None
+_ASSISTANT_BACKEND = None
+_ASSISTANT_MIN_INTERVAL_S = 60.0 / ASSISTANT_MAX_CALLS_PER_MINUTE
+_ASSISTANT_STATS = collections.Counter() # requests, cache_hits, deduplicated, combined, api_calls, errors; plus api_seconds
+_ASSISTANT_QUESTION_TAG = re.compile(r'^\[Q(\d+)\] (.*)$', re.MULTILINE)
+_ASSISTANT_ANSWER_TAG = re.compile(r'^\s*\[A(\d+)\]\s*', re.MULTILINE)
+
+def set_assistant_backend(backend, max_calls_per_minute=ASSISTANT_MAX_CALLS_PER_MINUTE):
+    """Select the backend answering assistant questions. max_calls_per_minute=None disables rate limiting."""
+    global _ASSISTANT_BACKEND, _ASSISTANT_MIN_INTERVAL_S
+    with _ASSISTANT_LOCK:
+        _ASSISTANT_BACKEND = backend; _ASSISTANT_MIN_INTERVAL_S = 60.0 / max_calls_per_minute if max_calls_per_minute else 0.0
+        _ASSISTANT_CACHE.clear()
+
+def _get_assistant_backend():
+    """Return the configured backend, setting up Gemini from GEMINI_API_KEY (environment or settings) on first use."""
+    global GEMINI_API_KEY
+    if _ASSISTANT_BACKEND is not None: return _ASSISTANT_BACKEND
+    if os.environ.get('EAZE_ASSISTANT_BACKEND') == 'stub': set_assistant_backend(StubAssistantBackend(), None); return _ASSISTANT_BACKEND
+    if not gemini_lib_installed: raise RuntimeError("google-generativeai is not installed.\nInstall using: pip install google-generativeai")
+    GEMINI_API_KEY = GEMINI_API_KEY or os.environ.get('GEMINI_API_KEY') or COMPANY_SETTINGS.get('gemini_api_key')
+    if not GEMINI_API_KEY: raise RuntimeError("No Gemini API key configured.\nSet the GEMINI_API_KEY environment variable.")
+    set_assistant_backend(GeminiAssistantBackend(GEMINI_API_KEY)); return _ASSISTANT_BACKEND
+
+def build_ledger_summary(today=None):
+    """Condense the ledger into totals, top items/customers and ageing of unpaid invoices; this is all the assistant is sent."""
+    today = today or datetime.date.today()
+    summary = {'as_of': today.strftime(DATE_FORMAT), 'customer_invoices': len(INVOICES_DATA), 'supplier_bills': len(SUPPLIER_INVOICES_DATA)}
+    item_sales = collections.Counter(); customer_sales = collections.Counter()
+    for invoice_type, invoices, items_index in (('customer', INVOICES_DATA, INVOICE_ITEMS_BY_INVOICE), ('supplier', SUPPLIER_INVOICES_DATA, SUPPLIER_INVOICE_ITEMS_BY_INVOICE)):
+        total = pending = ZERO_DECIMAL; ageing = {label: ZERO_DECIMAL for _, label in AGEING_BUCKETS}
+        for invoice in list(invoices):
+            invoice_total = calculate_invoice_total(invoice.get('id'), invoice_type); total += invoice_total
+            if invoice_type == 'customer':
+                customer_sales[invoice.get('customer_name', '')] += invoice_total
+                for item in items_index.get(invoice.get('id'), ()):
+                    try: item_sales[str(item.get('item', '')).strip()] += item.get('quantity', ZERO_DECIMAL) * item.get('price', ZERO_DECIMAL)
+                    except Exception: continue
+            if invoice.get('payment_status', 'P') != 'P': continue
+            pending += invoice_total
+            try: age_days = (today - datetime.datetime.strptime(invoice.get('date', ''), DATE_FORMAT).date()).days
+            except (ValueError, TypeError): continue
+            label = next(label for limit, label in AGEING_BUCKETS if limit is None or age_days <= limit); ageing[label] += invoice_total
+        prefix = 'sales' if invoice_type == 'customer' else 'purchases'
+        summary[f'{prefix}_total'] = total; summary[f'{prefix}_pending'] = pending; summary[f'{prefix}_ageing'] = ageing
+    summary['top_items'] = item_sales.most_common(ASSISTANT_TOP_N); summary['top_customers'] = customer_sales.most_common(ASSISTANT_TOP_N)
+    summary['low_stock_items'] = sum(1 for item in INVENTORY_DATA if item.get('quantity', ZERO_DECIMAL) <= LOW_STOCK_THRESHOLD)
+    return summary
+
+def _ledger_context():
+    """Ledger summary as prompt text, recomputed only when DATA_VERSION has moved on."""
+    global _ASSISTANT_SUMMARY
+    version = DATA_VERSION
+    if _ASSISTANT_SUMMARY[0] != version:
+        summary = build_ledger_summary()
+        lines = [f"As of {summary['as_of']}: {summary['customer_invoices']} customer invoices, {summary['supplier_bills']} supplier bills, {summary['low_stock_items']} low-stock items."]
+        for prefix, label in (('sales', "Sales"), ('purchases', "Purchases")):
+            ageing = ", ".join(f"{bucket} {format_currency(amount)}" for bucket, amount in summary[f'{prefix}_ageing'].items())
+            lines.append(f"{label}: total {format_currency(summary[f'{prefix}_total'])}, unpaid {format_currency(summary[f'{prefix}_pending'])} ({ageing}).")
+        lines.append("Top items by sales: " + ("; ".join(f"{name} {format_currency(amount)}" for name, amount in summary['top_items']) or "none"))
+        lines.append("Top customers by sales: " + ("; ".join(f"{name} {format_currency(amount)}" for name, amount in summary['top_customers']) or "none"))
+        _ASSISTANT_SUMMARY = (version, "\n".join(lines))
+    return _ASSISTANT_SUMMARY[1]
+
+def _assistant_prompt(questions):
+    """One prompt for a single question, or a combined prompt whose numbered answers _split_assistant_answer takes apart."""
+    company_name = COMPANY_SETTINGS.get('company_name', DEFAULT_SETTINGS['company_name'])
+    header = (f"You are EazeBot, the bookkeeping assistant in Eaze Inn Accounts for {company_name}. Amounts are in {CURRENCY_SYMBOL}.\n"
+              f"Answer briefly using only this ledger summary:\n{_ledger_context()}\n\n")
+    if len(questions) == 1: return header + f"Question: {questions[0]}"
+    numbered = "\n".join(f"[Q{number}] {' '.join(question.split())}" for number, question in enumerate(questions, 1))
+    return header + (f"Answer each of these {len(questions)} questions separately. Start every answer on a new line with its tag "
+                     f"([A1] for [Q1], [A2] for [Q2], ...) and do not refer to the other answers.\n{numbered}")
+
+def _split_assistant_answer(text, count):
+    """Split a combined answer into `count` answers by their [An] tags; None when any tag is missing."""
+    parts = _ASSISTANT_ANSWER_TAG.split(text); answers = {}
+    for number, answer in zip(parts[1::2], parts[2::2]): answers.setdefault(int(number), answer.strip())
+    if any(not answers.get(number) for number in range(1, count + 1)): return None
+    return [answers[number] for number in range(1, count + 1)]
+
+def _assistant_worker():
+    last_call = 0.0
+    def call_backend(keys):
+        """One rate-limited API call answering every question in keys; returns the answers in order."""
+        nonlocal last_call
+        backend = _get_assistant_backend(); prompt = _assistant_prompt([key[0] for key in keys])
+        delay = last_call + _ASSISTANT_MIN_INTERVAL_S - time.monotonic()
+        if delay > 0: time.sleep(delay)
+        last_call = time.monotonic(); text = backend.generate(prompt)
+        with _ASSISTANT_LOCK: _ASSISTANT_STATS['api_calls'] += 1; _ASSISTANT_STATS['api_seconds'] += time.monotonic() - last_call
+        if len(keys) == 1: return [text]
+        answers = _split_assistant_answer(text, len(keys))
+        if answers is None: return [call_backend([key])[0] for key in keys] # Malformed combined reply: ask one at a time
+        with _ASSISTANT_LOCK: _ASSISTANT_STATS['combined'] += len(keys) - 1
+        return answers
+    while True:
+        batch = [_ASSISTANT_QUEUE.get()]
+        deadline = time.monotonic() + ASSISTANT_BATCH_WINDOW_S
+        while len(batch) < ASSISTANT_BATCH_SIZE:
+            try: batch.append(_ASSISTANT_QUEUE.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty: break
+        waiting = collections.OrderedDict() # Identical questions are asked once; distinct ones share one combined prompt
+        for key, result_queue in batch: waiting.setdefault(key, []).append(result_queue)
+        with _ASSISTANT_LOCK:
+            answered = {key: _ASSISTANT_CACHE[key] for key in waiting if key in _ASSISTANT_CACHE} # Answered by an earlier batch
+            _ASSISTANT_STATS['cache_hits'] += sum(len(waiting[key]) for key in answered)
+            pending = [key for key in waiting if key not in answered]
+            _ASSISTANT_STATS['deduplicated'] += sum(len(waiting[key]) - 1 for key in pending)
+        if pending:
+            try:
+                answered.update(zip(pending, call_backend(pending)))
+                with _ASSISTANT_LOCK:
+                    for key in pending: _ASSISTANT_CACHE[key] = answered[key]
+                    while len(_ASSISTANT_CACHE) > ASSISTANT_CACHE_SIZE: _ASSISTANT_CACHE.popitem(last=False)
+            except Exception as e:
+                with _ASSISTANT_LOCK: _ASSISTANT_STATS['errors'] += 1
+                for key in pending:
+                    for result_queue in waiting.pop(key): result_queue.put(("Error", f"EazeBot request failed: {e}"))
+        for key, result_queues in waiting.items():
+            for result_queue in result_queues: result_queue.put(("Success", answered[key]))
+
+def ask_assistant(question, result_queue):
+    """Queue a question for EazeBot; ("Success", answer) or ("Error", message) arrives on result_queue. Cached answers return immediately."""
+    global _ASSISTANT_WORKER
+    key = (" ".join(question.split()).lower(), DATA_VERSION)
+    with _ASSISTANT_LOCK:
+        _ASSISTANT_STATS['requests'] += 1; answer = _ASSISTANT_CACHE.get(key)
+        if answer is not None: _ASSISTANT_CACHE.move_to_end(key); _ASSISTANT_STATS['cache_hits'] += 1
+    if answer is not None: result_queue.put(("Success", answer)); return
+    if _ASSISTANT_WORKER is None or not _ASSISTANT_WORKER.is_alive():
+        _ASSISTANT_WORKER = threading.Thread(target=_assistant_worker, name="AssistantWorker", daemon=True); _ASSISTANT_WORKER.start()
+    _ASSISTANT_QUEUE.put((key, result_queue))
+
+def assistant_stats():
+    with _ASSISTANT_LOCK: stats = dict(_ASSISTANT_STATS)
+    stats['cache_hit_rate'] = stats.get('cache_hits', 0) / stats['requests'] if stats.get('requests') else 0.0
+    return stats
+
+def reset_assistant_stats():
+    with _ASSISTANT_LOCK: _ASSISTANT_STATS.clear()
+
+def ask_eazebot(parent):
+    question = simpledialog.askstring("Ask EazeBot", "What would you like to know about your accounts?", parent=parent)
+    if not question or not question.strip(): return
+    result_queue = queue.Queue()
+    ask_assistant(question.strip(), result_queue)
+    parent.after(100, lambda: check_thread_queue(parent, result_queue, "EazeBot"))
+
+# --- Party Statements ---
+_INVOICE_PARTIES = {} # (invoice_type, invoice id) -> party name, so payments can be routed to their party
+_PAID_INVOICES = set() # (invoice_type, invoice id) of invoices with at least one payment record
+_SETTLED_ENTRIES = {} # (invoice_type, invoice id) -> (party, entry) for 'C' invoices settled without a payment record
+
+def _new_party_rollup():
+    # entries: sorted (date, kind order, record id, kind, amount) tuples; kind is 'invoice', 'payment' or
+    # 'settled' (an invoice marked paid with no payment record, counted as paid in full on its own date)
+    # monthly: {YYYY-MM: [billed, paid]}
+    return {'entries': [], 'monthly': {}, 'total_billed': ZERO_DECIMAL, 'total_paid': ZERO_DECIMAL}
+
+def _rollup_post(invoice_type, party, date_str, record_id, kind, amount):
+    rollup = PARTY_ROLLUPS.get((invoice_type, party))
+    if rollup is None: rollup = PARTY_ROLLUPS[(invoice_type, party)] = _new_party_rollup()
+    entry = (str(date_str or ''), 0 if kind == 'invoice' else 1, record_id if record_id is not None else 0, kind, amount)
+    if not rollup['entries'] or entry > rollup['entries'][-1]: rollup['entries'].append(entry) # Usual case: newest last
+    else: bisect.insort(rollup['entries'], entry)
+    month_totals = rollup['monthly'].setdefault(_month_of(date_str), [ZERO_DECIMAL, ZERO_DECIMAL])
+    if kind == 'invoice': month_totals[0] += amount; rollup['total_billed'] += amount
+    else: month_totals[1] += amount; rollup['total_paid'] += amount
+    return entry
+
+def _rollup_unpost(invoice_type, party, entry):
+    rollup = PARTY_ROLLUPS[(invoice_type, party)]; rollup['entries'].remove(entry)
+    month_totals = rollup['monthly'][_month_of(entry[0])]; month_totals[1] -= entry[4]; rollup['total_paid'] -= entry[4]
+
+def rollup_add_invoice(invoice_type, invoice):
+    """Fold a saved invoice/bill into its party's rollup. Its items must already be in the items index."""
+    party = invoice.get('customer_name' if invoice_type == 'customer' else 'supplier_name')
+    if not party: return
+    key = (invoice_type, invoice.get('id')); _INVOICE_PARTIES[key] = party
+    total = calculate_invoice_total(invoice.get('id'), invoice_type)
+    _rollup_post(invoice_type, party, invoice.get('date'), invoice.get('id'), 'invoice', total)
+    if invoice.get('payment_status') == 'C' and key not in _PAID_INVOICES:
+        _SETTLED_ENTRIES[key] = (party, _rollup_post(invoice_type, party, invoice.get('date'), invoice.get('id'), 'settled', total))
+
+def _payment_target(payment):
+    """(invoice_type, invoice id, party name key) a payment belongs to."""
+    if payment.get('supplier_invoice_id') is not None or payment.get('supplier_name'): return 'supplier', payment.get('supplier_invoice_id'), 'supplier_name'
+    return 'customer', payment.get('invoice_id'), 'customer_name'
+
+def rollup_add_payment(payment):
+    """
+    Fold a payment into the rollup of the party it belongs to (via its invoice, or a name on the payment itself).
+    The first payment of an invoice replaces the 'settled' entry its paid status implied.
+    """
+    invoice_type, invoice_id, name_key = _payment_target(payment)
+    if invoice_id is not None:
+        _PAID_INVOICES.add((invoice_type, invoice_id))
+        settled = _SETTLED_ENTRIES.pop((invoice_type, invoice_id), None)
+        if settled: _rollup_unpost(invoice_type, *settled)
+    party = payment.get(name_key) or _INVOICE_PARTIES.get((invoice_type, invoice_id))
+    if not party: return
+    amount = payment.get('amount', payment.get('amount_paid', ZERO_DECIMAL)) or ZERO_DECIMAL
+    _rollup_post(invoice_type, party, payment.get('date'), payment.get('id'), 'payment', amount)
+
+@instrumented('rollup_rebuild')
+def rebuild_party_rollups():
+    PARTY_ROLLUPS.clear(); _INVOICE_PARTIES.clear(); _SETTLED_ENTRIES.clear(); _PAID_INVOICES.clear()
+    for payment in PAYMENTS_DATA: # Known up front so paid-status invoices with payment records get no 'settled' entry
+        invoice_type, invoice_id, _ = _payment_target(payment)
+        if invoice_id is not None: _PAID_INVOICES.add((invoice_type, invoice_id))
+    for invoice in INVOICES_DATA: rollup_add_invoice('customer', invoice)
+    for bill in SUPPLIER_INVOICES_DATA: rollup_add_invoice('supplier', bill)
+    for payment in PAYMENTS_DATA: rollup_add_payment(payment)
+
+def party_names(invoice_type): return sorted(party for kind, party in PARTY_ROLLUPS if kind == invoice_type)
+
+def build_party_statement(invoice_type, party, start_date=None, end_date=None):
+    """
+    Statement for one party from its rollup: entries with running balance, invoice line items, monthly totals.
+    Dates are YYYY-MM-DD strings; entries before start_date are folded into the opening balance.
+    Invoices marked paid ('C') without any payment record count as paid in full on their own date ('settled' lines).
+    """
+    rollup = PARTY_ROLLUPS.get((invoice_type, party)) or _new_party_rollup()
+    items_index = INVOICE_ITEMS_BY_INVOICE if invoice_type == 'customer' else SUPPLIER_INVOICE_ITEMS_BY_INVOICE
+    start_index = bisect.bisect_left(rollup['entries'], (start_date,)) if start_date else 0
+    end_index = bisect.bisect_left(rollup['entries'], (end_date + '\uffff',)) if end_date else len(rollup['entries'])
+    opening_balance = ZERO_DECIMAL
+    for _, _, _, kind, amount in rollup['entries'][:start_index]: opening_balance += amount if kind == 'invoice' else -amount
+    balance = opening_balance; total_billed = total_paid = ZERO_DECIMAL; lines = []
+    for date_str, _, record_id, kind, amount in rollup['entries'][start_index:end_index]:
+        items = []
+        if kind == 'invoice':
+            balance += amount; total_billed += amount
+            for item in items_index.get(record_id, ()):
+                qty = item.get('quantity', ZERO_DECIMAL); price = item.get('price', ZERO_DECIMAL)
+                items.append((item.get('item', ''), qty, price, qty * price))
+        else: balance -= amount; total_paid += amount
+        lines.append({'date': date_str, 'kind': kind, 'ref': record_id, 'billed': amount if kind == 'invoice' else ZERO_DECIMAL,
+                      'paid': amount if kind != 'invoice' else ZERO_DECIMAL, 'balance': balance, 'items': items})
+    start_month = start_date[:7] if start_date else ''; end_month = end_date[:7] if end_date else '\uffff'
+    monthly = [(month, totals[0], totals[1]) for month, totals in sorted(rollup['monthly'].items()) if start_month <= month <= end_month]
+    return {'invoice_type': invoice_type, 'party': party, 'start_date': start_date, 'end_date': end_date, 'opening_balance': opening_balance,
+            'lines': lines, 'monthly': monthly, 'total_billed': total_billed, 'total_paid': total_paid, 'closing_balance': balance}
+
+def _statement_filename(statement, extension):
+    """Names that clean to the same text ("A & B", "A/B") stay apart through a short hash of the full party name."""
+    safe_party = re.sub(r'[^\w.-]+', '_', statement['party']).strip('_') or "party"
+    party_hash = hashlib.sha1(statement['party'].encode('utf-8')).hexdigest()[:8]
+    return f"statement_{statement['invoice_type']}_{safe_party}_{party_hash}_{datetime.datetime.now().strftime('%Y%m%d')}.{extension}"
+
+def _statement_particulars(line, document_label):
+    if line['kind'] == 'invoice': return f"{document_label} #{line['ref']}"
+    if line['kind'] == 'settled': return f"{document_label} #{line['ref']} marked paid"
+    return f"Payment #{line['ref']}"
+
+def _statement_period(statement):
+    return f"{statement['start_date'] or 'Beginning'} to {statement['end_date'] or datetime.date.today().strftime(DATE_FORMAT)}"
+
+def _write_statement_pdf(statement, pdf_file):
+    pdf = SimpleDocTemplate(pdf_file, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch, leftMargin=0.7*inch, rightMargin=0.7*inch)
+    styles = getSampleStyleSheet(); styles.add(ParagraphStyle(name='small', parent=styles['Normal'], fontSize=8)); styles['h1'].alignment = 1; styles['h2'].alignment = 1
+    company_name = COMPANY_SETTINGS.get('company_name', DEFAULT_SETTINGS['company_name']); company_address = COMPANY_SETTINGS.get('company_address', DEFAULT_SETTINGS['company_address'])
+    entity_label = "Customer" if statement['invoice_type'] == 'customer' else "Supplier"; document_label = "Invoice" if statement['invoice_type'] == 'customer' else "Bill"
+    story = [Paragraph(f"<b>{company_name}</b>", styles['h1']), Paragraph(company_address, styles['Normal']), Spacer(1, 0.1*inch),
+             Paragraph("<b>STATEMENT OF ACCOUNT</b>", styles['h2']), Paragraph(f"{entity_label}: <b>{statement['party']}</b>", styles['Normal']),
+             Paragraph(f"Period: {_statement_period(statement)}", styles['Normal']), Spacer(1, 0.2*inch)]
+    table_data = [["Date", "Particulars", "Billed", "Paid", "Balance"], ["", "Opening Balance", "", "", format_currency(statement['opening_balance'])]]
+    for line in statement['lines']:
+        table_data.append([line['date'], _statement_particulars(line, document_label), format_currency(line['billed']) if line['kind'] == 'invoice' else "", format_currency(line['paid']) if line['kind'] != 'invoice' else "", format_currency(line['balance'])])
+        for item_name, qty, price, amount in line['items']:
+            table_data.append(["", Paragraph(f"{item_name} - {format_decimal_quantity(qty)} x {format_currency(price)} = {format_currency(amount)}", styles['small']), "", "", ""])
+    table_data.append(["", "Closing Balance", format_currency(statement['total_billed']), format_currency(statement['total_paid']), format_currency(statement['closing_balance'])])
+    statement_table = Table(table_data, colWidths=[0.9*inch, 2.9*inch, 1.0*inch, 1.0*inch, 1.1*inch], repeatRows=1)
+    statement_table.setStyle(TableStyle([('BACKGROUND', (0, 0), (-1, 0), colors.grey), ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke), ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'), ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'), ('FONTSIZE', (0, 0), (-1, -1), 9), ('ALIGN', (2, 0), (-1, -1), 'RIGHT'), ('LINEBELOW', (0, 0), (-1, 0), 1, colors.black), ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black), ('VALIGN', (0, 0), (-1, -1), 'TOP')]))
+    story.append(statement_table); story.append(Spacer(1, 0.3*inch))
+    if statement['monthly']:
+        story.append(Paragraph("<u>Monthly Summary:</u>", styles['h4']))
+        monthly_table = Table([["Month", "Billed", "Paid"]] + [[month, format_currency(billed), format_currency(paid)] for month, billed, paid in statement['monthly']], colWidths=[1.2*inch, 1.3*inch, 1.3*inch])
+        monthly_table.setStyle(TableStyle([('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'), ('FONTSIZE', (0, 0), (-1, -1), 9), ('ALIGN', (1, 0), (-1, -1), 'RIGHT'), ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)]))
+        story.append(monthly_table)
+    pdf.build(story)
+    return os.path.abspath(pdf_file)
+
+def _write_statement_excel(statement, excel_file):
+    workbook = Workbook(write_only=True); sheet = workbook.create_sheet("Statement")
+    sheet.append([COMPANY_SETTINGS.get('company_name', DEFAULT_SETTINGS['company_name'])]); sheet.append(["Statement of Account", statement['party']]); sheet.append(["Period", _statement_period(statement)]); sheet.append([])
+    sheet.append(["Date", "Type", "Ref", "Item", "Qty", "Rate", "Amount", "Billed", "Paid", "Balance"])
+    sheet.append(["", "Opening Balance", "", "", "", "", "", "", "", float(statement['opening_balance'])])
+    for line in statement['lines']:
+        sheet.append([line['date'], line['kind'].capitalize(), line['ref'], "", "", "", "", float(line['billed']), float(line['paid']), float(line['balance'])])
+        for item_name, qty, price, amount in line['items']: sheet.append(["", "", "", item_name, float(qty), float(price), float(amount)])
+    sheet.append(["", "Closing Balance", "", "", "", "", "", float(statement['total_billed']), float(statement['total_paid']), float(statement['closing_balance'])])
+    monthly_sheet = workbook.create_sheet("Monthly"); monthly_sheet.append(["Month", "Billed", "Paid"])
+    for month, billed, paid in statement['monthly']: monthly_sheet.append([month, float(billed), float(paid)])
+    workbook.save(excel_file)
+    return os.path.abspath(excel_file)
+
+@instrumented('statement_export')
+def generate_statement_file_threaded(statement, file_format, result_queue):
+    try:
+        if file_format == 'pdf': result_queue.put(("Success", _write_statement_pdf(statement, _statement_filename(statement, 'pdf'))))
+        else: result_queue.put(("Success", _write_statement_excel(statement, _statement_filename(statement, 'xlsx'))))
+    except Exception as e: result_queue.put(("Error", f"Statement export failed: {e}\n{traceback.format_exc()}"))
+
+@instrumented('statement_bulk_build')
+def build_all_party_statements(invoice_type, start_date=None, end_date=None):
+    """
+    One statement per party of invoice_type; total work is proportional to all parties' activity.
+    Reads the rollups that saves keep updating, so call it on the Tk thread; the statements it returns share no
+    mutable state with them and can be written out by a worker.
+    """
+    return [build_party_statement(invoice_type, party, start_date, end_date) for party in party_names(invoice_type)]
+
+@instrumented('statement_bulk_run')
+def generate_all_statements_threaded(statements, file_format, output_dir, result_queue):
+    """Write statements built by build_all_party_statements into output_dir."""
+    try:
+        os.makedirs(output_dir, exist_ok=True); written = 0
+        for statement in statements:
+            filename = os.path.join(output_dir, _statement_filename(statement, 'pdf' if file_format == 'pdf' else 'xlsx'))
+            if file_format == 'pdf': _write_statement_pdf(statement, filename)
+            else: _write_statement_excel(statement, filename)
+            written += 1
+        result_queue.put(("Success", f"{written} statements saved in:\n{os.path.abspath(output_dir)}"))
+    except Exception as e: result_queue.put(("Error", f"Statement run failed: {e}\n{traceback.format_exc()}"))
+
+def create_statement_window(parent):
+    statement_window = tk.Toplevel(parent)
+    statement_window.title("Party Statements")
+    statement_window.geometry("850x600")
+    statement_window.transient(parent)
+
+    main_frame = ttk.Frame(statement_window, padding="10")
+    main_frame.pack(fill=tk.BOTH, expand=True)
+
+    # Statement Options
+    options_frame = ttk.LabelFrame(main_frame, text="Statement", padding="10")
+    options_frame.pack(fill=tk.X, padx=5, pady=5)
+    type_var = tk.StringVar(value="Customer")
+    party_var = tk.StringVar()
+    ttk.Label(options_frame, text="Type:").grid(row=0, column=0, sticky="w", padx=5, pady=3)
+    type_combo = ttk.Combobox(options_frame, textvariable=type_var, values=("Customer", "Supplier"), state="readonly", width=10)
+    type_combo.grid(row=0, column=1, sticky="w", padx=5, pady=3)
+    ttk.Label(options_frame, text="Party:").grid(row=0, column=2, sticky="w", padx=5, pady=3)
+    party_combo = ttk.Combobox(options_frame, textvariable=party_var, width=30)
+    party_combo.grid(row=0, column=3, sticky="ew", padx=5, pady=3)
+    ttk.Label(options_frame, text="From:").grid(row=1, column=0, sticky="w", padx=5, pady=3)
+    start_var = tk.StringVar()
+    ttk.Entry(options_frame, textvariable=start_var, width=12).grid(row=1, column=1, sticky="w", padx=5, pady=3)
+    ttk.Label(options_frame, text="To:").grid(row=1, column=2, sticky="w", padx=5, pady=3)
+    end_var = tk.StringVar()
+    ttk.Entry(options_frame, textvariable=end_var, width=12).grid(row=1, column=3, sticky="w", padx=5, pady=3)
+    options_frame.grid_columnconfigure(3, weight=1)
+
+    def selected_type(): return 'customer' if type_var.get() == "Customer" else 'supplier'
+    def refresh_parties(*_):
+        party_combo['values'] = party_names(selected_type()); party_var.set("")
+    type_combo.bind("<<ComboboxSelected>>", refresh_parties)
+    refresh_parties()
+
+    # Statement Lines
+    columns = ("Date", "Particulars", "Billed", "Paid", "Balance")
+    tree = ttk.Treeview(main_frame, columns=columns, show="headings")
+    for col in columns:
+        tree.heading(col, text=col)
+        tree.column(col, width=300 if col == "Particulars" else 110, anchor="w" if col in ("Date", "Particulars") else "e")
+    tree_scroll = ttk.Scrollbar(main_frame, orient="vertical", command=tree.yview)
+    tree.configure(yscrollcommand=tree_scroll.set)
+    tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+    tree.pack(fill=tk.BOTH, expand=True, padx=5)
+    current = {'statement': None}
+
+    def read_period():
+        dates = []
+        for value in (start_var.get().strip(), end_var.get().strip()):
+            if value: datetime.datetime.strptime(value, DATE_FORMAT)
+            dates.append(value or None)
+        return dates
+
+    def show_statement():
+        party = party_var.get().strip()
+        if not party:
+            messagebox.showerror("Error", "Please select a party", parent=statement_window)
+            return
+        try: start_date, end_date = read_period()
+        except ValueError:
+            messagebox.showerror("Error", "Please enter valid dates (YYYY-MM-DD) or leave them blank", parent=statement_window)
+            return
+        statement = current['statement'] = build_party_statement(selected_type(), party, start_date, end_date)
+        document_label = "Invoice" if statement['invoice_type'] == 'customer' else "Bill"
+        tree.delete(*tree.get_children())
+        tree.insert("", tk.END, values=("", "Opening Balance", "", "", format_currency(statement['opening_balance'])))
+        for line in statement['lines']:
+            tree.insert("", tk.END, values=(line['date'], _statement_particulars(line, document_label), format_currency(line['billed']) if line['kind'] == 'invoice' else "",
+                                            format_currency(line['paid']) if line['kind'] != 'invoice' else "", format_currency(line['balance'])))
+            for item_name, qty, price, amount in line['items']:
+                tree.insert("", tk.END, values=("", f"    {item_name}  {format_decimal_quantity(qty)} x {format_currency(price)} = {format_currency(amount)}", "", "", ""))
+        tree.insert("", tk.END, values=("", "Closing Balance", format_currency(statement['total_billed']), format_currency(statement['total_paid']), format_currency(statement['closing_balance'])))
+
+    def export_statement(file_format):
+        if current['statement'] is None:
+            messagebox.showerror("Error", "Show a statement first", parent=statement_window)
+            return
+        result_queue = queue.Queue()
+        threading.Thread(target=generate_statement_file_threaded, args=(current['statement'], file_format, result_queue), daemon=True).start()
+        operation_name = "PDF Generation" if file_format == 'pdf' else "Excel Export"
+        statement_window.after(100, lambda: check_thread_queue(statement_window, result_queue, operation_name))
+
+    def export_all_statements():
+        try: start_date, end_date = read_period()
+        except ValueError:
+            messagebox.showerror("Error", "Please enter valid dates (YYYY-MM-DD) or leave them blank", parent=statement_window)
+            return
+        output_dir = filedialog.askdirectory(title="Select Folder for Statements", initialdir=os.path.abspath("."), parent=statement_window)
+        if not output_dir: return
+        file_format = 'pdf' if messagebox.askyesno("Statement Format", "Save as PDF?\n(No saves Excel workbooks)", parent=statement_window) else 'xlsx'
+        statements = build_all_party_statements(selected_type(), start_date, end_date) # On the Tk thread, away from concurrent saves
+        result_queue = queue.Queue()
+        threading.Thread(target=generate_all_statements_threaded, args=(statements, file_format, os.path.join(output_dir, STATEMENTS_DIR), result_queue), daemon=True).start()
+        statement_window.after(100, lambda: check_thread_queue(statement_window, result_queue, "Statement Run"))
+
+    # Bottom Buttons
+    button_frame = ttk.Frame(main_frame)
+    button_frame.pack(fill=tk.X, pady=10)
+    ttk.Button(button_frame, text="Show", command=show_statement).pack(side=tk.LEFT, padx=5)
+    ttk.Button(button_frame, text="Export PDF", command=lambda: export_statement('pdf')).pack(side=tk.LEFT, padx=5)
+    ttk.Button(button_frame, text="Export Excel", command=lambda: export_statement('xlsx')).pack(side=tk.LEFT, padx=5)
+    ttk.Button(button_frame, text="All Statements...", command=export_all_statements).pack(side=tk.LEFT, padx=5)
+    ttk.Button(button_frame, text="Close", command=statement_window.destroy).pack(side=tk.RIGHT, padx=5)
+
 def create_invoice_window(title_text, entity_label_text, invoice_type, parent):
     invoice_window = tk.Toplevel(parent)
     invoice_window.title(title_text)
@@ -682,11 +1814,13 @@ def create_invoice_window(title_text, entity_label_text, invoice_type, parent):
             
             for item in items:
                 item_id = get_next_id(INVOICE_ITEMS_DATA)
-                INVOICE_ITEMS_DATA.append({
+                item_record = {
                     'id': item_id,
                     'invoice_id': new_id,
                     **item
-                })
+                }
+                INVOICE_ITEMS_DATA.append(item_record)
+                _index_invoice_item(item_record)
             save_data(INVOICE_ITEMS_DATA, INVOICE_ITEMS_FILE)
         else:
             SUPPLIER_INVOICES_DATA.append(invoice_data)
@@ -694,12 +1828,16 @@ def create_invoice_window(title_text, entity_label_text, invoice_type, parent):
             
             for item in items:
                 item_id = get_next_id(SUPPLIER_INVOICE_ITEMS_DATA)
-                SUPPLIER_INVOICE_ITEMS_DATA.append({
+                item_record = {
                     'id': item_id,
                     'supplier_invoice_id': new_id,
                     **item
-                })
+                }
+                SUPPLIER_INVOICE_ITEMS_DATA.append(item_record)
+                _index_supplier_invoice_item(item_record)
             save_data(SUPPLIER_INVOICE_ITEMS_DATA, SUPPLIER_INVOICE_ITEMS_FILE)
+        mark_chart_periods_dirty(invoice_type, invoice_data['date'], new_id)
+        rollup_add_invoice(invoice_type, invoice_data)
             
         messagebox.showinfo("Success", 
                            f"{'Invoice' if invoice_type == 'customer' else 'Bill'} #{new_id} created successfully",
@@ -711,6 +1849,130 @@ def create_invoice_window(title_text, entity_label_text, invoice_type, parent):
     
     entity_combo.focus_set()
 
+def compute_dashboard_totals():
+    """Return (pending receivables, pending payables, inventory value) for the dashboard cards."""
+    total_receivables = ZERO_DECIMAL
+    for inv in INVOICES_DATA:
+        if inv.get('payment_status', 'P') == 'P':
+            total_receivables += calculate_invoice_total(inv['id'], 'customer')
+    total_payables = ZERO_DECIMAL
+    for bill in SUPPLIER_INVOICES_DATA:
+        if bill.get('payment_status', 'P') == 'P':
+            total_payables += calculate_invoice_total(bill['id'], 'supplier')
+    inventory_value = sum((item.get('quantity', ZERO_DECIMAL) * item.get('value', ZERO_DECIMAL))
+                         for item in INVENTORY_DATA if item.get('quantity', ZERO_DECIMAL) > ZERO_DECIMAL)
+    return total_receivables, total_payables, inventory_value
+
+def create_chart_window(parent):
+    if not matplotlib_installed:
+        messagebox.showwarning("EazeBot Charts", "matplotlib is not installed.\nInstall using: pip install matplotlib", parent=parent)
+        return
+    chart_window = tk.Toplevel(parent)
+    chart_window.title("EazeBot Charts")
+    chart_window.geometry("760x560")
+    chart_window.transient(parent)
+
+    main_frame = ttk.Frame(chart_window, padding="10")
+    main_frame.pack(fill=tk.BOTH, expand=True)
+
+    # Chart Options
+    options_frame = ttk.Frame(main_frame)
+    options_frame.pack(fill=tk.X, pady=(0, 5))
+    ttk.Label(options_frame, text="Chart:").pack(side=tk.LEFT, padx=2)
+    chart_var = tk.StringVar(value=CHART_TYPES[0])
+    ttk.Combobox(options_frame, textvariable=chart_var, values=CHART_TYPES, state="readonly", width=20).pack(side=tk.LEFT, padx=2)
+    today = datetime.date.today()
+    ttk.Label(options_frame, text="From (YYYY-MM):").pack(side=tk.LEFT, padx=2)
+    start_var = tk.StringVar(value=f"{today.year - 1}-{today.month:02d}")
+    ttk.Entry(options_frame, textvariable=start_var, width=8).pack(side=tk.LEFT, padx=2)
+    ttk.Label(options_frame, text="To:").pack(side=tk.LEFT, padx=2)
+    end_var = tk.StringVar(value=today.strftime('%Y-%m'))
+    ttk.Entry(options_frame, textvariable=end_var, width=8).pack(side=tk.LEFT, padx=2)
+
+    image_label = ttk.Label(main_frame, anchor="center")
+    image_label.pack(fill=tk.BOTH, expand=True)
+    status_label = ttk.Label(main_frame, text="")
+    status_label.pack(fill=tk.X)
+
+    def poll_chart(result_queue):
+        if not chart_window.winfo_exists(): return
+        try: status, payload = result_queue.get_nowait()
+        except queue.Empty: chart_window.after(50, lambda: poll_chart(result_queue)); return
+        if status == "Success":
+            photo = ImageTk.PhotoImage(Image.open(io.BytesIO(payload)))
+            image_label.config(image=photo); image_label.image = photo # Keep a reference or Tk drops the image
+            status_label.config(text="")
+        else: status_label.config(text="Could not render chart."); messagebox.showerror("Chart Error", payload, parent=chart_window)
+
+    def show_chart():
+        start_month, end_month = start_var.get().strip(), end_var.get().strip()
+        try: datetime.datetime.strptime(start_month, '%Y-%m'); datetime.datetime.strptime(end_month, '%Y-%m')
+        except ValueError:
+            messagebox.showerror("Error", "Please enter months as YYYY-MM", parent=chart_window)
+            return
+        status_label.config(text="Rendering chart...")
+        result_queue = queue.Queue()
+        request_chart(chart_var.get(), start_month, end_month, result_queue)
+        poll_chart(result_queue)
+
+    ttk.Button(options_frame, text="Show", command=show_chart).pack(side=tk.LEFT, padx=5)
+    show_chart()
+
+def create_diagnostics_window(parent):
+    diag_window = tk.Toplevel(parent)
+    diag_window.title("Diagnostics")
+    diag_window.geometry("720x420")
+    diag_window.transient(parent)
+
+    main_frame = ttk.Frame(diag_window, padding="10")
+    main_frame.pack(fill=tk.BOTH, expand=True)
+
+    # Controls
+    controls_frame = ttk.Frame(main_frame)
+    controls_frame.pack(fill=tk.X, pady=(0, 5))
+    enabled_var = tk.BooleanVar(value=PERF_METRICS_ENABLED)
+    def toggle_metrics():
+        global PERF_METRICS_ENABLED
+        PERF_METRICS_ENABLED = enabled_var.get()
+    ttk.Checkbutton(controls_frame, text="Collect metrics", variable=enabled_var, command=toggle_metrics).pack(side=tk.LEFT, padx=5)
+    profile_button = ttk.Button(controls_frame, text="Stop Profiling" if is_profiling() else "Start Profiling")
+    def toggle_profiling():
+        if is_profiling():
+            profile_path = stop_profiling(); profile_button.config(text="Start Profiling")
+            messagebox.showinfo("Profiling", f"Profile saved to:\n{os.path.abspath(profile_path)}", parent=diag_window)
+        else: start_profiling(); profile_button.config(text="Stop Profiling")
+    profile_button.config(command=toggle_profiling); profile_button.pack(side=tk.RIGHT, padx=5)
+
+    # Latency table
+    columns = ("Operation", "Calls", "p50 (ms)", "p95 (ms)", "Max (ms)", "Bytes Written")
+    tree = ttk.Treeview(main_frame, columns=columns, show="headings", height=10)
+    for col in columns:
+        tree.heading(col, text=col)
+        tree.column(col, width=180 if col == "Operation" else 90, anchor="w" if col == "Operation" else "e")
+    tree.pack(fill=tk.BOTH, expand=True)
+    counters_label = ttk.Label(main_frame, text="", anchor="w", justify=tk.LEFT)
+    counters_label.pack(fill=tk.X, pady=5)
+
+    def refresh():
+        if not diag_window.winfo_exists(): return
+        rows, counters = perf_snapshot()
+        tree.delete(*tree.get_children())
+        for row in rows:
+            tree.insert("", tk.END, values=(row['operation'], row['count'], f"{row['p50_ms']:.2f}", f"{row['p95_ms']:.2f}", f"{row['max_ms']:.2f}", f"{row['bytes']:,}"))
+        counters_label.config(text="  ".join(f"{name}: {value:,}" for name, value in sorted(counters.items())) or "No counters recorded yet.")
+        diag_window.after(2000, refresh)
+
+    # Bottom Buttons
+    button_frame = ttk.Frame(main_frame)
+    button_frame.pack(fill=tk.X, pady=5)
+    def write_log():
+        if write_perf_summary(): messagebox.showinfo("Diagnostics", f"Summary written to:\n{os.path.abspath(PERF_LOG_FILE)}", parent=diag_window)
+        else: messagebox.showwarning("Diagnostics", "Nothing to write yet. Enable metrics and use the app first.", parent=diag_window)
+    ttk.Button(button_frame, text="Close", command=diag_window.destroy).pack(side=tk.RIGHT, padx=5)
+    ttk.Button(button_frame, text="Write to Log", command=write_log).pack(side=tk.RIGHT, padx=5)
+    ttk.Button(button_frame, text="Reset", command=reset_perf_metrics).pack(side=tk.RIGHT, padx=5)
+    refresh()
+
 def create_dashboard(root):
     dashboard_window = tk.Toplevel(root)
     dashboard_window.title("Eaze Inn Accounts Dashboard")
@@ -735,16 +1997,7 @@ def create_dashboard(root):
     dash_frame.pack(fill=tk.BOTH, expand=True)
 
     # Calculate dynamic values
-    total_receivables = ZERO_DECIMAL
-    for inv in INVOICES_DATA:
-        if inv.get('payment_status', 'P') == 'P':
-            total_receivables += calculate_invoice_total(inv['id'], 'customer')
-    total_payables = ZERO_DECIMAL
-    for bill in SUPPLIER_INVOICES_DATA:
-        if bill.get('payment_status', 'P') == 'P':
-            total_payables += calculate_invoice_total(bill['id'], 'supplier')
-    inventory_value = sum((item.get('quantity', ZERO_DECIMAL) * item.get('value', ZERO_DECIMAL))
-                         for item in INVENTORY_DATA if item.get('quantity', ZERO_DECIMAL) > ZERO_DECIMAL)
+    total_receivables, total_payables, inventory_value = compute_dashboard_totals()
     cards = [
         ("Pending Receivables", format_currency(total_receivables), "blue"),
         ("Pending Payables", format_currency(total_payables), "red"),
@@ -768,6 +2021,20 @@ def create_dashboard(root):
                command=lambda: messagebox.showinfo("Inventory", "Inventory feature coming soon!", parent=dashboard_window)).pack(side=tk.LEFT, padx=5)
     ttk.Button(nav_frame, text="Payments", width=20,
                command=lambda: messagebox.showinfo("Payments", "Payments feature coming soon!", parent=dashboard_window)).pack(side=tk.LEFT, padx=5)
+    ttk.Button(nav_frame, text="Statements", width=20,
+               command=lambda: create_statement_window(dashboard_window)).pack(side=tk.LEFT, padx=5)
+
+    # Tools
+    tools_frame = ttk.Frame(dashboard_window, padding=(10, 0, 10, 10))
+    tools_frame.pack(fill=tk.X)
+    ttk.Button(tools_frame, text="Bulk Import", width=20,
+               command=lambda: bulk_import(dashboard_window)).pack(side=tk.LEFT, padx=5)
+    ttk.Button(tools_frame, text="Ask EazeBot", width=20,
+               command=lambda: ask_eazebot(dashboard_window)).pack(side=tk.LEFT, padx=5)
+    ttk.Button(tools_frame, text="EazeBot Charts", width=20,
+               command=lambda: create_chart_window(dashboard_window)).pack(side=tk.LEFT, padx=5)
+    ttk.Button(tools_frame, text="Diagnostics", width=20,
+               command=lambda: create_diagnostics_window(dashboard_window)).pack(side=tk.LEFT, padx=5)
 
     def on_dashboard_closing():
         if messagebox.askokcancel("Quit", "Do you want to exit the application?", parent=dashboard_window):
@@ -777,6 +2044,7 @@ def create_dashboard(root):
 # --- Main Function ---
 def main():
     root = tk.Tk(); root.title("Eaze Inn Accounts - Login"); root.geometry("350x250"); root.resizable(False, False);
+    root.withdraw(); load_all_data_with_splash(root); root.deiconify()
     root.update_idletasks(); width = root.winfo_width(); height = root.winfo_height(); x_pos = (root.winfo_screenwidth() // 2) - (width // 2); y_pos = (root.winfo_screenheight() // 2) - (height // 2); root.geometry(f'{width}x{height}+{x_pos}+{y_pos}')
     style = ttk.Style(root)
     try:
@@ -802,7 +2070,8 @@ if __name__ == "__main__":
         if THERMAL_PRINTER_TYPE == 'win32raw' and not win32print_installed and os.name == 'nt': print("\nWARNING: pywin32 library not found, but required for 'win32raw' printer type.\n         Install using: pip install pywin32\n")
         # New check for matplotlib
         if not matplotlib_installed: print("\nWARNING: matplotlib not found. EazeBot charting will be disabled.\n         Install using: pip install matplotlib\n")
-        load_all_data(); print("Starting main application UI..."); main()
+        if os.environ.get('EAZE_PROFILE', '0') not in ('', '0'): start_profiling()
+        print("Starting main application UI..."); main()
     except Exception as e_global:
          print(f"\n--- FATAL APPLICATION ERROR ---"); print(f"Error Type: {type(e_global).__name__}"); print(f"Error: {e_global}"); print(traceback.format_exc()); print("-------------------------------")
          try:
@@ -811,4 +2080,7 @@ if __name__ == "__main__":
              root_err_popup.destroy()
          except Exception as tk_err_popup: print(f"Could not display Tkinter error message box: {tk_err_popup}")
          finally: print("\nApplication encountered a fatal error. Exiting.")
-    finally: print(f"--- Eaze Inn Accounts finished [{datetime.datetime.now()}] ---")
\ No newline at end of file
+    finally:
+        if is_profiling(): stop_profiling()
+        if PERF_METRICS_ENABLED: write_perf_summary()
+        print(f"--- Eaze Inn Accounts finished [{datetime.datetime.now()}] ---")
\ No newline at end of file
@@ -0,0 +1,246 @@
+# --- eaze_inn_benchmark.py ---
+# Headless performance benchmarks for Eaze Inn Accounts.
+#
+# Generates a deterministic synthetic data set in the real DATA_DIR JSON format, points the app at it
+# and times the hot paths. Results are written as JSON so runs can be compared across versions and sizes:
+#
+#     python eaze_inn_benchmark.py --sizes 10000,100000,1000000 --label v1.2 --output bench_v1.2.json
+
+import os
+import sys
+import io
+import json
+import time
+import queue
+import shutil
+import random
+import argparse
+import datetime
+import platform
+import tempfile
+import statistics
+import contextlib
+import traceback
+from decimal import Decimal
+
+import eaze_inn_accounts as app
+
+BENCHMARK_SEED = 1234
+BENCHMARK_START_DATE = datetime.date(2023, 1, 1)
+BENCHMARK_DAYS_SPAN = 730
+INVENTORY_BATCH_SIZE = 100 # Line items posted per update_inventory_after_transaction() call
+INVOICE_TOTAL_SAMPLE = 1000 # Invoices totalled per calculate_invoice_total() run
+ASSISTANT_REQUESTS = 50 # Questions sent per assistant run, drawn from ASSISTANT_QUESTIONS
+ASSISTANT_STUB_LATENCY_S = 0.05 # Simulated round trip of the offline assistant backend
+ASSISTANT_QUESTIONS = (
+    "How much do customers owe us?", "Which items sell best?", "Who are my top customers?", "How much do we owe suppliers?",
+    "How old are our unpaid invoices?", "What were total sales?", "What were total purchases?", "How many items are low on stock?",
+    "Is the business profitable?", "Which customers should I chase first?",
+)
+
+
+# --- Synthetic Data Generator ---
+DATASET_SHAPE_KEYS = ('customers', 'suppliers', 'skus', 'customer_invoices', 'supplier_invoices')
+
+def dataset_shape(rows, **counts):
+    """
+    Entity counts for a data set of `rows` line items. The preset roughly matches a small trading business;
+    any of DATASET_SHAPE_KEYS passed as a keyword (and not None) overrides the derived value.
+    """
+    invoices = max(1, rows // 5)
+    shape = {
+        'customers': max(10, rows // 100),
+        'suppliers': max(5, rows // 1000),
+        'skus': max(20, rows // 50),
+        'customer_invoices': max(1, invoices * 7 // 10),
+        'supplier_invoices': max(1, invoices - invoices * 7 // 10),
+    }
+    for key, count in counts.items():
+        if key not in shape: raise ValueError(f"Unknown dataset count '{key}'")
+        if count is not None:
+            if count < 1: raise ValueError(f"{key} must be at least 1")
+            shape[key] = count
+    shape['line_items'] = rows
+    return shape
+
+def _write_json_array(filepath, records):
+    """Write records as a JSON array one at a time so generating a million rows never holds them all in memory."""
+    count = 0
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for record in records:
+            f.write(',\n' if count else '\n'); f.write(json.dumps(record, cls=app.DecimalEncoder, indent=4)); count += 1
+        f.write('\n]' if count else ']')
+    return count
+
+def _random_date(rng):
+    return (BENCHMARK_START_DATE + datetime.timedelta(days=rng.randrange(BENCHMARK_DAYS_SPAN))).strftime(app.DATE_FORMAT)
+
+def _random_amount(rng, low, high):
+    return Decimal(rng.randrange(low * 100, high * 100)) / 100
+
+def generate_dataset(data_dir, rows, seed=BENCHMARK_SEED, **counts):
+    """
+    Write users, invoices, bills, their line items, inventory and payments for `rows` line items into data_dir.
+    Entity counts default to dataset_shape(rows) and can be overridden with keyword counts (see DATASET_SHAPE_KEYS).
+    Every settled ('C') invoice gets one payment equal to its total, so statement balances reconcile.
+    The same arguments always produce byte-identical files.
+    """
+    shape = dataset_shape(rows, **counts); rng = random.Random(seed)
+    os.makedirs(data_dir, exist_ok=True)
+    customers = [f"Customer {n:06d}" for n in range(1, shape['customers'] + 1)]
+    suppliers = [f"Supplier {n:05d}" for n in range(1, shape['suppliers'] + 1)]
+    skus = [(f"SKU-{n:06d}", _random_amount(rng, 5, 500)) for n in range(1, shape['skus'] + 1)]
+
+    _write_json_array(os.path.join(data_dir, "users.json"), [{'id': 1, 'username': 'bench', 'password': app.hash_password('bench')}])
+    customer_invoices = [{'id': n, 'date': _random_date(rng), 'customer_name': rng.choice(customers), 'payment_status': 'P' if rng.random() < 0.4 else 'C'}
+                         for n in range(1, shape['customer_invoices'] + 1)]
+    supplier_invoices = [{'id': n, 'date': _random_date(rng), 'supplier_name': rng.choice(suppliers), 'payment_status': 'P' if rng.random() < 0.3 else 'C'}
+                         for n in range(1, shape['supplier_invoices'] + 1)]
+    _write_json_array(os.path.join(data_dir, "invoices.json"), customer_invoices)
+    _write_json_array(os.path.join(data_dir, "supplier_invoices.json"), supplier_invoices)
+
+    # Line items are split between sales and purchases in proportion to the invoice counts
+    customer_rows = rows * shape['customer_invoices'] // (shape['customer_invoices'] + shape['supplier_invoices'])
+    invoice_totals = {'invoice_id': {}, 'supplier_invoice_id': {}} # Filled while items are written, used for payments
+    def line_items(count, invoice_count, invoice_key, markup):
+        totals = invoice_totals[invoice_key]
+        for n in range(1, count + 1):
+            sku, cost = rng.choice(skus); invoice_id = rng.randint(1, invoice_count)
+            quantity = Decimal(rng.randint(1, 20)); price = (cost * markup).quantize(app.TWO_PLACES)
+            totals[invoice_id] = totals.get(invoice_id, app.ZERO_DECIMAL) + quantity * price
+            yield {'id': n, invoice_key: invoice_id, 'item': sku, 'quantity': quantity, 'price': price}
+    _write_json_array(os.path.join(data_dir, "invoice_items.json"), line_items(customer_rows, shape['customer_invoices'], 'invoice_id', Decimal('1.25')))
+    _write_json_array(os.path.join(data_dir, "supplier_invoice_items.json"), line_items(rows - customer_rows, shape['supplier_invoices'], 'supplier_invoice_id', Decimal('1')))
+
+    _write_json_array(os.path.join(data_dir, "inventory.json"), ({'id': n, 'item_name': sku, 'quantity': Decimal(rng.randint(0, 500)), 'value': cost,
+                                                                  'last_updated': f"{_random_date(rng)} 09:00:00"} for n, (sku, cost) in enumerate(skus, 1)))
+    def payments():
+        payment_id = 0
+        for invoices, invoice_key in ((customer_invoices, 'invoice_id'), (supplier_invoices, 'supplier_invoice_id')):
+            for invoice in invoices:
+                amount = invoice_totals[invoice_key].get(invoice['id'], app.ZERO_DECIMAL)
+                if invoice['payment_status'] == 'C' and amount:
+                    payment_id += 1
+                    yield {'id': payment_id, invoice_key: invoice['id'], 'date': invoice['date'], 'amount': amount}
+    _write_json_array(os.path.join(data_dir, "payments.json"), payments())
+    with open(os.path.join(data_dir, "settings.json"), 'w', encoding='utf-8') as f:
+        json.dump(dict(app.DEFAULT_SETTINGS, company_name="Benchmark Traders"), f, indent=4)
+    return shape
+
+
+# --- Timing Harness ---
+def _time_call(func, repeat, setup=None):
+    """Run func `repeat` times (setup, if given, runs untimed before each call) and summarise wall-clock seconds."""
+    timings = []
+    for _ in range(repeat):
+        if setup: setup()
+        start = time.perf_counter(); func(); timings.append(time.perf_counter() - start)
+    return {'runs': repeat, 'min_s': min(timings), 'median_s': statistics.median(timings), 'max_s': max(timings), 'mean_s': statistics.mean(timings)}
+
+def _expect_success(result_queue, operation_name, timeout=60):
+    status, message = result_queue.get(timeout=timeout)
+    if status != "Success": raise RuntimeError(f"{operation_name} reported {status}: {message}")
+
+def _benchmarks(work_dir):
+    """
+    Return {name: (callable, setup, units_per_call, extra)}; callables run against the data currently loaded into the app.
+    extra, if set, is called after timing and its dict is merged into the result.
+    """
+    scratch_file = os.path.join(work_dir, "save_data_scratch.json")
+    def save_invoice_items(): app.save_data(app.INVOICE_ITEMS_DATA, scratch_file)
+    def next_item_id(): app.get_next_id(app.INVOICE_ITEMS_DATA)
+    sample_ids = [inv['id'] for inv in app.INVOICES_DATA[:INVOICE_TOTAL_SAMPLE]]
+    def invoice_totals():
+        for invoice_id in sample_ids: app.calculate_invoice_total(invoice_id, 'customer')
+    purchases = [{'item': item['item_name'], 'quantity': Decimal('1'), 'price': item.get('value', app.ZERO_DECIMAL)} for item in app.INVENTORY_DATA[:INVENTORY_BATCH_SIZE]]
+    def post_inventory(): app.update_inventory_after_transaction('supplier', purchases)
+    pdf_invoice = app.INVOICES_DATA[0] if app.INVOICES_DATA else {'id': 0, 'date': BENCHMARK_START_DATE.strftime(app.DATE_FORMAT), 'customer_name': 'Nobody'}
+    pdf_items = app.INVOICE_ITEMS_BY_INVOICE.get(pdf_invoice['id'], [])
+    def build_pdf():
+        result_queue = queue.Queue()
+        app.generate_pdf_invoice_threaded(pdf_invoice['id'], 'customer', pdf_invoice['customer_name'], pdf_invoice, pdf_items, result_queue)
+        _expect_success(result_queue, "PDF Generation")
+    backup_dir = os.path.join(work_dir, "eaze_inn_json_backup")
+    def clear_backups(): shutil.rmtree(backup_dir, ignore_errors=True)
+    def backup():
+        result_queue = queue.Queue(); app.backup_all_data_threaded(result_queue); _expect_success(result_queue, "Backup")
+    question_rng = random.Random(BENCHMARK_SEED); questions = [question_rng.choice(ASSISTANT_QUESTIONS) for _ in range(ASSISTANT_REQUESTS)]
+    def reset_assistant(): app.set_assistant_backend(app.StubAssistantBackend(ASSISTANT_STUB_LATENCY_S), None) # Also empties the answer cache
+    def ask_questions():
+        result_queues = []
+        for question in questions:
+            result_queue = queue.Queue(); app.ask_assistant(question, result_queue); result_queues.append(result_queue)
+        for result_queue in result_queues: _expect_success(result_queue, "Assistant")
+    return {
+        'load_all_data': (app.load_all_data, None, 1, None),
+        'save_data': (save_invoice_items, None, 1, None),
+        'get_next_id': (next_item_id, None, 1, None),
+        'calculate_invoice_total': (invoice_totals, None, len(sample_ids), None),
+        'dashboard_totals': (app.compute_dashboard_totals, None, 1, None),
+        'update_inventory_after_transaction': (post_inventory, None, len(purchases), None),
+        'generate_pdf_invoice': (build_pdf, None, 1, None),
+        'backup_all_data': (backup, clear_backups, 1, None),
+        'assistant_stub': (ask_questions, reset_assistant, len(questions), app.assistant_stats),
+    }
+
+def run_size(rows, work_root, repeat=3, seed=BENCHMARK_SEED, only=None, verbose=False, counts=None):
+    """Generate a data set of `rows` line items (entity counts overridable via `counts`) under work_root and time every benchmark against it."""
+    work_dir = os.path.abspath(os.path.join(work_root, f"rows_{rows}")); data_dir = os.path.join(work_dir, app.DATA_DIR)
+    shutil.rmtree(work_dir, ignore_errors=True); os.makedirs(work_dir)
+    start = time.perf_counter(); shape = generate_dataset(data_dir, rows, seed, **(counts or {})); generate_s = time.perf_counter() - start
+    data_bytes = sum(os.path.getsize(os.path.join(data_dir, name)) for name in os.listdir(data_dir))
+    original_cwd = os.getcwd(); original_data_dir = app.DATA_DIR; results = {}
+    # PDFs and backups are written relative to the working directory, so run inside the scratch area
+    os.chdir(work_dir); app.set_data_dir(data_dir)
+    try:
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        with output:
+            app.load_all_data()
+            app.reset_assistant_stats()
+            for name, (func, setup, units, extra) in _benchmarks(work_dir).items():
+                if only and name not in only: continue
+                try:
+                    results[name] = _time_call(func, repeat, setup); results[name]['units_per_call'] = units
+                    if extra: results[name].update(extra())
+                except Exception as e:
+                    results[name] = {'error': f"{type(e).__name__}: {e}", 'traceback': traceback.format_exc()}
+    finally:
+        os.chdir(original_cwd); app.set_data_dir(original_data_dir)
+    return {'rows': rows, 'seed': seed, 'dataset': dict(shape, bytes=data_bytes, generate_s=generate_s), 'results': results}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Eaze Inn Accounts hot paths against synthetic data.")
+    parser.add_argument('--sizes', default="10000", help="Comma-separated line-item counts, e.g. 10000,100000,1000000")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument('--seed', type=int, default=BENCHMARK_SEED)
+    for key in DATASET_SHAPE_KEYS:
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key, type=int, default=None, help=f"Number of {key.replace('_', ' ')} (default: derived from each size)")
+    parser.add_argument('--only', default="", help="Comma-separated benchmark names to run (default: all)")
+    parser.add_argument('--label', default="", help="Free-form tag recorded with the results, e.g. a version number")
+    parser.add_argument('--workdir', default=None, help="Where to generate data sets (default: a temporary directory)")
+    parser.add_argument('--keep', action='store_true', help="Keep generated data sets after the run")
+    parser.add_argument('--output', default=None, help="Write the JSON report here instead of stdout")
+    parser.add_argument('--verbose', action='store_true', help="Show the app's console output during timed runs")
+    args = parser.parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    only = {name.strip() for name in args.only.split(',') if name.strip()}
+    counts = {key: getattr(args, key) for key in DATASET_SHAPE_KEYS}
+    work_root = args.workdir or tempfile.mkdtemp(prefix="eaze_inn_bench_")
+    report = {'label': args.label, 'timestamp': datetime.datetime.now().isoformat(timespec='seconds'), 'python': sys.version.split()[0],
+              'platform': platform.platform(), 'repeat': args.repeat, 'runs': []}
+    try:
+        for rows in sizes:
+            print(f"Benchmarking {rows} rows...", file=sys.stderr)
+            report['runs'].append(run_size(rows, work_root, args.repeat, args.seed, only, args.verbose, counts))
+    finally:
+        if not args.keep: shutil.rmtree(work_root, ignore_errors=True)
+    report_json = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f: f.write(report_json)
+        print(f"Benchmark report saved to {args.output}", file=sys.stderr)
+    else: print(report_json)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())